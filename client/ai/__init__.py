@@ -1,8 +1,26 @@
-import json
+from importlib import import_module
 from json.decoder import JSONDecodeError
 import logging
 
 
+def get_ai(version):
+    """Get AI class of a given version
+
+    Parameters
+    ----------
+    version : int
+
+    Returns
+    -------
+    class
+        AI class derived from GenericAI, None if there is no such version
+    """
+    try:
+        return import_module('ai.ai{0}'.format(int(version))).AI
+    except ImportError:
+        return None
+
+
 class GenericAI(object):
     """Basic AI agent implementation
     """
@@ -39,7 +57,11 @@ class GenericAI(object):
                 exit(1)
             self.current_player_name = game.current_player.get_name()
             if self.current_player_name == self.player_name and not self.waitingForResponse:
-                self.ai_turn()
+                if game.synchronized:
+                    self.ai_turn()
+                else:
+                    self.send_message('resync')
+                    self.waitingForResponse = True
 
     def ai_turn(self):
         """Actual agent behaviour
@@ -56,9 +78,10 @@ class GenericAI(object):
         """
         self.logger.debug("Received message type {0}.".format(msg["type"]))
         if msg['type'] == 'battle':
+            self.game.check_sequence(msg)
             atk_data = msg['result']['atk']
             def_data = msg['result']['def']
-            attacker = self.game.board.get_area(str(atk_data['name']))
+            attacker = self.game.board.get_area(atk_data['name'])
             attacker.set_dice(atk_data['dice'])
             atk_name = attacker.get_owner_name()
 
@@ -68,12 +91,12 @@ class GenericAI(object):
 
             if def_data['owner'] == atk_data['owner']:
                 defender.set_owner(atk_data['owner'])
-                self.game.players[atk_name].set_score(msg['score'][str(atk_name)])
-                self.game.players[def_name].set_score(msg['score'][str(def_name)])
+                self.game.set_scores(msg['score'])
 
             self.waitingForResponse = False
 
         elif msg['type'] == 'end_turn':
+            self.game.check_sequence(msg)
             current_player = self.game.players[self.game.current_player_name]
 
             for area in msg['areas']:
@@ -91,9 +114,13 @@ class GenericAI(object):
             self.game.players[self.game.current_player_name].activate()
             self.waitingForResponse = False
 
+        elif msg['type'] == 'game_state':
+            self.game.apply_state(msg)
+            self.waitingForResponse = False
+
         elif msg['type'] == 'game_end':
             self.logger.info("Player {} has won".format(msg['winner']))
-            self.game.socket.close()
+            self.game.close_socket()
             return False
 
         return True
@@ -107,20 +134,4 @@ class GenericAI(object):
         attacker : int
         defender : int
         """
-        if type == 'close':
-            msg = {'type': 'close'}
-        elif type == 'battle':
-            msg = {
-                'type': 'battle',
-                'atk': attacker,
-                'def': defender
-            }
-        elif type == 'end_turn':
-            msg = {'type': 'end_turn'}
-            self.logger.debug("Sending end_turn message.")
-
-        try:
-            self.game.socket.send(str.encode(json.dumps(msg)))
-        except BrokenPipeError:
-            self.logger.error("Connection to server broken.")
-            exit(1)
+        self.game.send_message(type, attacker=attacker, defender=defender)
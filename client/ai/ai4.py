@@ -2,6 +2,7 @@ from random import shuffle
 from pprint import pprint
 
 from ai import GenericAI
+from ai.regions import Regions
 from ai.utils import attack_succcess_probability, probability_of_holding_area, probability_of_successful_attack
 
 
@@ -25,6 +26,8 @@ class AI(GenericAI):
             Probability treshold for choosing an attack
         score_weight: float
             Preference of an attack from largest region over other attacks
+        regions : Regions
+            Regions of the players' areas
         """
         super(AI, self).__init__(game)
         self.new_turn = False
@@ -38,7 +41,8 @@ class AI(GenericAI):
         self.attacked = False
 
         self.possible_attackers = []
-        self.largest_region  = []
+        self.largest_region = set()
+        self.regions = Regions(self.board)
 
     def ai_turn(self):
         """AI agent's turn
@@ -105,7 +109,7 @@ class AI(GenericAI):
 
         Attributes
         ----------
-        largest_region : list of int
+        largest_region : set of int
             Names of areas in the largest region
 
         Returns
@@ -113,48 +117,12 @@ class AI(GenericAI):
         int
             Number of areas in the largest region
         """
-        board = self.game.board
-        self.largest_region = []
+        self.largest_region = set()
         largest_region_size = 0
-        largest_region = [] # names of areas in largest region
-        areas_to_test = []
-        player_areas = []
-
-        for area in self.board.areas.values():
-            if area.get_owner_name() == self.player_name:
-                areas_to_test.append(area.get_name())
-
-        if not areas_to_test:
-            return 0
-
-        areas_in_current_region = [areas_to_test[0]]
-
-        while areas_to_test:
-            areas_already_tested = []
-            while areas_in_current_region:
-                current_area = areas_in_current_region[0]
-                areas_in_current_region.remove(current_area)
-                areas_already_tested.append(current_area)
-
-                for area in board.get_area(current_area).get_adjacent_areas():
-                    if (area not in areas_already_tested and
-                        area not in areas_in_current_region):
-                        if board.get_area(area).get_owner_name() == self.player_name:
-                            areas_in_current_region.append(area)
-
-            if len(areas_already_tested) > largest_region_size:
-                for area in areas_already_tested:
-                    largest_region.append(area)
-                largest_region_size = len(areas_already_tested)
-
-            for area in areas_already_tested:
-                if area in areas_to_test:
-                    areas_to_test.remove(area)
-                    player_areas.append(area)
-
-            if areas_to_test:
-                areas_in_current_region = [areas_to_test[0]]
-
-        for area in largest_region:
-            self.largest_region.append(area)
+        # regions are ranked in the order of their first areas, every region
+        # larger than all the preceding ones is preferred
+        for region in sorted(self.regions.get_regions(self.player_name), key=min):
+            if len(region) > largest_region_size:
+                self.largest_region |= region
+                largest_region_size = len(region)
         return largest_region_size
@@ -3,7 +3,8 @@ import numpy
 from random import shuffle
 
 from ai import GenericAI
-from ai.utils import attack_succcess_probability , probability_of_successful_attack, sigmoid
+from ai.regions import Regions
+from ai.utils import attack_succcess_probability , probability_of_successful_attack, sigmoid, get_weights
 
 
 class AI(GenericAI):
@@ -26,18 +27,21 @@ class AI(GenericAI):
             Names of players in the order they are playing, with the agent being first
         weights : dict of numpy.array
             Weights for estimating win probability
-        largest_region: list of int
+        largest_region: set of int
             Names of areas in the largest region
+        regions : Regions
+            Regions of the players' areas
         """
         super(AI, self).__init__(game)
         self.players = len(self.game.players)
-        self.largest_region  = []
+        self.largest_region = set()
+        self.regions = Regions(self.board)
 
         self.players_order = game.players_order
         while self.player_name != self.players_order[0]:
             self.players_order.append(self.players_order.pop(0))
 
-        self.weights = {
+        self.weights = get_weights({
             2: numpy.array([3.06600354, -3.06600354]),
             3: numpy.array([1.16329046, -0.81105584, -0.80085993]),
             4: numpy.array([0.91252927, -0.55857427, -0.51781521, -0.57183507]),
@@ -45,7 +49,7 @@ class AI(GenericAI):
             6: numpy.array([0.74465716, -0.40179109, -0.39851363, -0.39515928, -0.43863283, -0.38371555]),
             7: numpy.array([0.72382109, -0.39171476, -0.39423241, -0.38390144, -0.38401564, -0.36980703, -0.36138501]),
             8: numpy.array([0.72340846, -0.35936507, -0.38758583, -0.35487285, -0.37616735, -0.37974499, -0.34989554, -0.37451491]),
-        }[self.players]
+        }, self.players)
         numpy.warnings.filterwarnings('ignore')
 
     def ai_turn(self):
@@ -103,7 +107,7 @@ class AI(GenericAI):
         wp_start = numpy.log(sigmoid(numpy.dot(numpy.array(features), self.weights)))
 
         end_features = [d for d in features]
-        end_features[0] = numpy.log(self.game.board.get_player_dice(name) + self.get_score_by_player(name))
+        end_features[0] = numpy.log(self.game.board.get_player_dice(name) + self.regions.get_largest_size(name))
         if numpy.isinf(end_features[0]):
             end_features[0] = 0
         wp_end = numpy.log(sigmoid(numpy.dot(numpy.array(end_features), self.weights)))
@@ -135,7 +139,7 @@ class AI(GenericAI):
                                     break
 
                         a_dice = self.game.board.get_player_dice(name)
-                        a_score = self.get_score_by_player(name)
+                        a_score = self.regions.get_largest_size(name)
                         if increase_score:
                             a_score += 1
 
@@ -146,7 +150,7 @@ class AI(GenericAI):
                         }
 
                         d_dice = self.game.board.get_player_dice(opponent_name)
-                        d_score = self.get_score_by_player(opponent_name)
+                        d_score = self.regions.get_largest_size(opponent_name)
                         def_dice = {
                             "loss": d_dice,
                             "win": d_dice - def_power,
@@ -183,125 +187,18 @@ class AI(GenericAI):
 
         return sorted(turns, key=lambda turn: turn[2], reverse=True)
 
-    def get_score_by_player(self, player_name, skip_area=None):
-        """Get score of a player
-
-        Parameters
-        ----------
-        player_name : int
-        skip_area : int
-            Name of an area to be excluded from the calculation
-
-        Returns
-        -------
-        int
-            score of the player
-        """
-        board = self.game.board
-        score = 0
-        areas_to_test = []
-        player_areas = []
-
-        # Find player areas and skip the area specified by skip_area
-        for area in self.board.areas.values():
-            if (area.get_owner_name() == player_name and area.get_name() != skip_area):
-                areas_to_test.append(area.get_name())
-
-        if not areas_to_test:
-            return 0
-
-        areas_in_current_region = [areas_to_test[0]]
-        # Iterate over all areas belonging to the player
-        while areas_to_test:
-            areas_already_tested = []
-            # Iterate over a single region
-            while areas_in_current_region:
-                current_area = areas_in_current_region[0]
-                areas_in_current_region.remove(current_area)
-                areas_already_tested.append(current_area)
-
-                for area in board.get_area(current_area).get_adjacent_areas():
-                    if (area not in areas_already_tested and
-                        area not in areas_in_current_region and
-                        area != skip_area):
-                        if board.get_area(area).get_owner_name() == player_name:
-                            areas_in_current_region.append(area)
-
-            if len(areas_already_tested) > score:
-                score = len(areas_already_tested)
-
-            # Remove areas in the current region from the areas yet to be tested
-            for area in areas_already_tested:
-                if area in areas_to_test:
-                    areas_to_test.remove(area)
-                    player_areas.append(area)
-
-            if areas_to_test:
-                areas_in_current_region = [areas_to_test[0]]
-
-        return score
-
     def get_largest_region(self):
         """Get size of the largest region, including the areas within
 
         Attributes
         ----------
-        largest_region : list of int
-            Names of areas in the largest region
+        largest_region : set of int
+            Names of areas in the largest regions
 
         Returns
         -------
         int
             Number of areas in the largest region
         """
-        board = self.game.board
-        self.largest_region = []
-        largest_region_size = 0
-        largest_regions = [] # names of areas in largest regions
-        areas_to_test = []
-        player_areas = []
-
-        for area in self.board.areas.values():
-            if area.get_owner_name() == self.player_name:
-                areas_to_test.append(area.get_name())
-
-        if not areas_to_test:
-            return 0
-
-        areas_in_current_region = [areas_to_test[0]]
-
-        while areas_to_test:
-            areas_already_tested = []
-            while areas_in_current_region:
-                current_area = areas_in_current_region[0]
-                areas_in_current_region.remove(current_area)
-                areas_already_tested.append(current_area)
-
-                for area in board.get_area(current_area).get_adjacent_areas():
-                    if (area not in areas_already_tested and
-                        area not in areas_in_current_region):
-                        if board.get_area(area).get_owner_name() == self.player_name:
-                            areas_in_current_region.append(area)
-
-            region_size = len(areas_already_tested)
-            if region_size >= largest_region_size:
-                region = []
-                for area in areas_already_tested:
-                    region.append(area)
-                if region_size > largest_region_size:
-                    largest_regions = []
-                largest_regions.append(region)
-                largest_region_size = region_size
-
-            for area in areas_already_tested:
-                if area in areas_to_test:
-                    areas_to_test.remove(area)
-                    player_areas.append(area)
-
-            if areas_to_test:
-                areas_in_current_region = [areas_to_test[0]]
-
-        for region in largest_regions:
-            for area in region:
-                self.largest_region.append(area)
-        return largest_region_size
+        self.largest_region = set().union(*self.regions.get_largest_regions(self.player_name))
+        return self.regions.get_largest_size(self.player_name)
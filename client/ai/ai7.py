@@ -4,7 +4,8 @@ from random import shuffle
 from pprint import pprint
 
 from ai import GenericAI
-from ai.utils import attack_succcess_probability , probability_of_successful_attack, sigmoid
+from ai.regions import Regions
+from ai.utils import attack_succcess_probability , probability_of_successful_attack, sigmoid, get_weights
 
 
 class AI(GenericAI):
@@ -28,18 +29,21 @@ class AI(GenericAI):
             Names of players in the order they are playing, with the agent being first
         weights : dict of numpy.array
             Weights for estimating win probability
-        largest_region: list of int
+        largest_region: set of int
             Names of areas in the largest region
+        regions : Regions
+            Regions of the players' areas
         """
         super(AI, self).__init__(game)
         self.players = len(self.game.players)
-        self.largest_region  = []
+        self.largest_region = set()
+        self.regions = Regions(self.board)
 
         self.players_order = game.players_order
         while self.player_name != self.players_order[0]:
             self.players_order.append(self.players_order.pop(0))
 
-        self.weights = {
+        self.weights = get_weights({
             2: numpy.array([1.30214778, 2.25563871, -1.30214778, -2.25563871]),
             3: numpy.array([1.03427841, 0.50262886, -0.78619448, -0.31264667,
                             -0.74070513, -0.3344083]),
@@ -59,7 +63,7 @@ class AI(GenericAI):
                             -0.3288953, -0.16076534, -0.31261043, -0.14316612,
                             -0.31785557, -0.16003507, -0.31410674, -0.16487769,
                             -0.33290964, -0.12624279, -0.33843017, -0.14888412]),
-        }[self.players]
+        }, self.players, features=2)
         numpy.warnings.filterwarnings('ignore')
 
     def ai_turn(self):
@@ -113,9 +117,9 @@ class AI(GenericAI):
         """
         features = []
         for p in self.players_order:
-            score = numpy.log(self.get_score_by_player(p) + 1)
+            score = numpy.log(self.regions.get_largest_size(p) + 1)
             if end_turn and p == self.player_name:
-                dice = numpy.log(self.game.board.get_player_dice(p) + self.get_score_by_player(p) + 1)
+                dice = numpy.log(self.game.board.get_player_dice(p) + self.regions.get_largest_size(p) + 1)
             else:
                 dice = numpy.log(self.game.board.get_player_dice(p) + 1)
             features.append(score)
@@ -163,7 +167,7 @@ class AI(GenericAI):
                                     break
 
                         a_dice = self.game.board.get_player_dice(name)
-                        a_score = self.get_score_by_player(name)
+                        a_score = self.regions.get_largest_size(name)
                         if increase_score:
                             a_score += 1
 
@@ -174,7 +178,7 @@ class AI(GenericAI):
                         }
 
                         d_dice = self.game.board.get_player_dice(opponent_name)
-                        d_score = self.get_score_by_player(opponent_name)
+                        d_score = self.regions.get_largest_size(opponent_name)
                         def_dice = {
                             "loss": d_dice,
                             "win": d_dice - def_power,
@@ -203,125 +207,18 @@ class AI(GenericAI):
 
         return sorted(turns, key=lambda turn: turn[2], reverse=True)
 
-    def get_score_by_player(self, player_name, skip_area=None):
-        """Get score of a player
-
-        Parameters
-        ----------
-        player_name : int
-        skip_area : int
-            Name of an area to be excluded from the calculation
-
-        Returns
-        -------
-        int
-            score of the player
-        """
-        board = self.game.board
-        score = 0
-        areas_to_test = []
-        player_areas = []
-
-        # Find player areas and skip the area specified by skip_area
-        for area in self.board.areas.values():
-            if (area.get_owner_name() == player_name and area.get_name() != skip_area):
-                areas_to_test.append(area.get_name())
-
-        if not areas_to_test:
-            return 0
-
-        areas_in_current_region = [areas_to_test[0]]
-        # Iterate over all areas belonging to the player
-        while areas_to_test:
-            areas_already_tested = []
-            # Iterate over a single region
-            while areas_in_current_region:
-                current_area = areas_in_current_region[0]
-                areas_in_current_region.remove(current_area)
-                areas_already_tested.append(current_area)
-
-                for area in board.get_area(current_area).get_adjacent_areas():
-                    if (area not in areas_already_tested and
-                        area not in areas_in_current_region and
-                        area != skip_area):
-                        if board.get_area(area).get_owner_name() == player_name:
-                            areas_in_current_region.append(area)
-
-            if len(areas_already_tested) > score:
-                score = len(areas_already_tested)
-
-            # Remove areas in the current region from the areas yet to be tested
-            for area in areas_already_tested:
-                if area in areas_to_test:
-                    areas_to_test.remove(area)
-                    player_areas.append(area)
-
-            if areas_to_test:
-                areas_in_current_region = [areas_to_test[0]]
-
-        return score
-
     def get_largest_region(self):
         """Get size of the largest region, including the areas within
 
         Attributes
         ----------
-        largest_region : list of int
-            Names of areas in the largest region
+        largest_region : set of int
+            Names of areas in the largest regions
 
         Returns
         -------
         int
             Number of areas in the largest region
         """
-        board = self.game.board
-        self.largest_region = []
-        largest_region_size = 0
-        largest_regions = [] # names of areas in largest regions
-        areas_to_test = []
-        player_areas = []
-
-        for area in self.board.areas.values():
-            if area.get_owner_name() == self.player_name:
-                areas_to_test.append(area.get_name())
-
-        if not areas_to_test:
-            return 0
-
-        areas_in_current_region = [areas_to_test[0]]
-
-        while areas_to_test:
-            areas_already_tested = []
-            while areas_in_current_region:
-                current_area = areas_in_current_region[0]
-                areas_in_current_region.remove(current_area)
-                areas_already_tested.append(current_area)
-
-                for area in board.get_area(current_area).get_adjacent_areas():
-                    if (area not in areas_already_tested and
-                        area not in areas_in_current_region):
-                        if board.get_area(area).get_owner_name() == self.player_name:
-                            areas_in_current_region.append(area)
-
-            region_size = len(areas_already_tested)
-            if region_size >= largest_region_size:
-                region = []
-                for area in areas_already_tested:
-                    region.append(area)
-                if region_size > largest_region_size:
-                    largest_regions = []
-                largest_regions.append(region)
-                largest_region_size = region_size
-
-            for area in areas_already_tested:
-                if area in areas_to_test:
-                    areas_to_test.remove(area)
-                    player_areas.append(area)
-
-            if areas_to_test:
-                areas_in_current_region = [areas_to_test[0]]
-
-        for region in largest_regions:
-            for area in region:
-                self.largest_region.append(area)
-        return largest_region_size
+        self.largest_region = set().union(*self.regions.get_largest_regions(self.player_name))
+        return self.regions.get_largest_size(self.player_name)
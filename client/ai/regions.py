@@ -0,0 +1,295 @@
+class Regions(object):
+    """Regions of connected areas of each player
+
+    Regions are kept up to date as areas change their owners: an area
+    joining a player merges the player's adjacent regions, an area leaving
+    a player splits its former region, searching only the areas of that
+    region. Queries do not scan the board.
+
+    Areas whose loss would split a region (articulation points) and the
+    scores of a player after losing each of the areas are indexed by a
+    single depth-first search of the player's regions, done on the first
+    such query after an area of the player changes its owner.
+    """
+    def __init__(self, board):
+        """
+        Parameters
+        ----------
+        board : Board
+
+        Attributes
+        ----------
+        labels : list of int
+            Identifier of the region of each area, 0 if there is no such area
+        regions : dict of int: set of int
+            Names of the areas in each region
+        player_regions : dict of int: set of int
+            Identifiers of the regions of each player
+        losses : dict of int: dict of int: int
+            Score of each player after losing each of their areas,
+            see index_player
+        articulations : dict of int: set of int
+            Names of the areas of each player splitting a region when lost
+        """
+        self.board = board
+        self.labels = [0] * len(board.owners)
+        self.regions = {}
+        self.player_regions = {}
+        self.losses = {}
+        self.articulations = {}
+        self.next_label = 1
+
+        for player, areas in board.player_areas.items():
+            for name in areas:
+                if not self.labels[name]:
+                    self.add_region(player, self.search(name, player))
+
+        board.add_observer(self.change_owner)
+
+    def get_region(self, name):
+        """Get the region of an area
+
+        Parameters
+        ----------
+        name : int
+
+        Returns
+        -------
+        set of int
+            Names of the areas in the region, the set is updated as the
+            game goes on and must not be modified
+        """
+        return self.regions[self.labels[name]]
+
+    def get_regions(self, player):
+        """Get regions of a player
+
+        Parameters
+        ----------
+        player : int
+
+        Returns
+        -------
+        list of set of int
+        """
+        return [self.regions[label] for label in self.player_regions.get(player, ())]
+
+    def get_largest_size(self, player):
+        """Get number of areas in the largest region of a player,
+        i.e. the player's score
+
+        Parameters
+        ----------
+        player : int
+
+        Returns
+        -------
+        int
+        """
+        return max((len(self.regions[label]) for label in self.player_regions.get(player, ())), default=0)
+
+    def get_largest_regions(self, player):
+        """Get all regions of a player of the largest size
+
+        Parameters
+        ----------
+        player : int
+
+        Returns
+        -------
+        list of set of int
+        """
+        size = self.get_largest_size(player)
+        return [region for region in self.get_regions(player) if len(region) == size]
+
+    def get_score_without(self, player, name):
+        """Get score of a player if they lost an area
+
+        Parameters
+        ----------
+        player : int
+        name : int
+            Name of the area
+
+        Returns
+        -------
+        int
+            Number of areas in the largest region of the player without the area
+        """
+        if self.board.owners[name] != player:
+            return self.get_largest_size(player)
+        if player not in self.losses:
+            self.index_player(player)
+        return self.losses[player][name]
+
+    def splits_region(self, name):
+        """Check whether losing an area splits its region
+
+        Parameters
+        ----------
+        name : int
+
+        Returns
+        -------
+        bool
+        """
+        player = self.board.owners[name]
+        if player not in self.articulations:
+            self.index_player(player)
+        return name in self.articulations[player]
+
+    def index_player(self, player):
+        """Index articulation points of a player's regions and scores of
+        the player after losing each of their areas
+
+        Parameters
+        ----------
+        player : int
+        """
+        losses = self.losses[player] = {}
+        articulations = self.articulations[player] = set()
+
+        labels = sorted(self.player_regions.get(player, ()), key=lambda l: len(self.regions[l]), reverse=True)
+        sizes = [len(self.regions[l]) for l in labels[:2]] + [0, 0]
+        for label in labels:
+            # size of the largest of the other regions
+            others = sizes[1] if label == labels[0] else sizes[0]
+            for name, pieces in self.get_pieces(self.regions[label]).items():
+                if len(pieces) > 1:
+                    articulations.add(name)
+                losses[name] = max([others] + pieces)
+
+    def get_pieces(self, region):
+        """Find the pieces a region falls apart into after losing each of its areas
+
+        Iterative variant of Tarjan's depth-first search for articulation
+        points, every area is visited once.
+
+        Parameters
+        ----------
+        region : set of int
+
+        Returns
+        -------
+        dict of int: list of int
+            Sizes of the pieces of the region without each of its areas
+        """
+        areas = self.board.areas
+        root = min(region)
+        order = {root: 0}
+        low = {root: 0}
+        size = {root: 1}
+        separated = {name: [] for name in region}
+
+        stack = [(root, None, iter(areas[root].neighbours))]
+        while stack:
+            name, parent, neighbours = stack[-1]
+            for n in neighbours:
+                if n not in region:
+                    continue
+                if n not in order:
+                    order[n] = low[n] = len(order)
+                    size[n] = 1
+                    stack.append((n, name, iter(areas[n].neighbours)))
+                    break
+                if n != parent:
+                    low[name] = min(low[name], order[n])
+            else:
+                stack.pop()
+                if parent is not None:
+                    low[parent] = min(low[parent], low[name])
+                    size[parent] += size[name]
+                    # the subtree of the area is cut off by losing its parent
+                    if low[name] >= order[parent]:
+                        separated[parent].append(size[name])
+
+        pieces = {}
+        for name, subtrees in separated.items():
+            rest = len(region) - 1 - sum(subtrees)
+            pieces[name] = subtrees + [rest] if rest else subtrees
+        return pieces
+
+    def search(self, name, player):
+        """Find areas of a player connected to an area
+
+        Parameters
+        ----------
+        name : int
+            Name of the first area
+        player : int
+
+        Returns
+        -------
+        set of int
+        """
+        owners = self.board.owners
+        areas = self.board.areas
+        found = {name}
+        stack = [name]
+        while stack:
+            for n in areas[stack.pop()].neighbours:
+                if n not in found and owners[n] == player:
+                    found.add(n)
+                    stack.append(n)
+        return found
+
+    def add_region(self, player, region):
+        """Label areas of a new region
+
+        Parameters
+        ----------
+        player : int
+        region : set of int
+        """
+        label = self.next_label
+        self.next_label += 1
+        self.regions[label] = region
+        self.player_regions.setdefault(player, set()).add(label)
+        for name in region:
+            self.labels[name] = label
+
+    def remove_region(self, player, label):
+        """Forget a region
+        """
+        del self.regions[label]
+        self.player_regions[player].discard(label)
+
+    def change_owner(self, name, old, new):
+        """Update regions when an area changes its owner, see Board.add_observer
+
+        Parameters
+        ----------
+        name : int
+        old : int
+            Name of the previous owner
+        new : int
+            Name of the new owner
+        """
+        for player in (old, new):
+            self.losses.pop(player, None)
+            self.articulations.pop(player, None)
+
+        # split the former region
+        label = self.labels[name]
+        if label:
+            region = self.regions[label]
+            region.discard(name)
+            self.remove_region(old, label)
+            for n in self.board.areas[name].neighbours:
+                if n in region and self.labels[n] == label:
+                    self.add_region(old, self.search(n, old))
+
+        # merge adjacent regions of the new owner into the largest one
+        labels = set(self.labels[n] for n in self.board.areas[name].neighbours if self.board.owners[n] == new)
+        if not labels:
+            self.add_region(new, {name})
+            return
+        label = max(labels, key=lambda l: len(self.regions[l]))
+        region = self.regions[label]
+        region.add(name)
+        self.labels[name] = label
+        for l in labels - {label}:
+            for n in self.regions[l]:
+                self.labels[n] = label
+            region |= self.regions[l]
+            self.remove_region(new, l)
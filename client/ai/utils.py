@@ -17,6 +17,34 @@ def sigmoid(a):
     return 1 / (1 + numpy.exp(-a)) 
 
 
+def get_weights(weights, players, features=1):
+    """Get weights for estimating win probability in a game of given size
+
+    Games with more players than the trained weights are estimated by the
+    weights of the largest game: the agent's weights are kept and the
+    opponents' weights are averaged and used for every opponent.
+
+    Parameters
+    ----------
+    weights : dict of int: numpy.array
+        Trained weights for numbers of players
+    players : int
+        Number of players in the game
+    features : int
+        Number of features of a single player
+
+    Returns
+    -------
+    numpy.array
+    """
+    if players in weights:
+        return weights[players]
+
+    largest = weights[max(weights)]
+    opponents = largest[features:].reshape(-1, features).mean(axis=0)
+    return numpy.concatenate([largest[:features], numpy.tile(opponents, players - 1)])
+
+
 def probability_of_holding_area(board, area_name, area_dice, player_name):
     """Estimate probability of holding an area until next turn
 
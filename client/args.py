@@ -5,6 +5,16 @@ parser.add_argument('-p', '--port', help="Server port", type=int, default=5005)
 parser.add_argument('-a', '--address', help="Server address", default='127.0.0.1')
 parser.add_argument('-d', '--debug', help="Enable debug output", default='WARN')
 parser.add_argument('--ai', help="Ai version", type=int)
+parser.add_argument('--encoding', help="Preferred encoding of messages",
+                    choices=['json', 'msgpack'], default='json')
+parser.add_argument('--board-cache', help="Directory boards received from the server are "
+                    "cached in, ~/.cache/dicewars/boards by default")
+parser.add_argument('--ready-fd', help="File descriptor 'ready' is written to once the client "
+                    "is connected to the server", type=int)
+parser.add_argument('--no-board-cache', help="Do not cache boards received from the server",
+                    action='store_true')
+parser.add_argument('--board-cache-size', help="Largest number of cached boards, the least "
+                    "recently used boards are removed", type=int, default=256)
 
 
 def parse():
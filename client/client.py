@@ -1,12 +1,21 @@
 #!/usr/bin/env python3
 import logging
-from importlib import import_module
-from PyQt5.QtWidgets import QApplication
+import os
 import sys
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai import get_ai
 from args import parse
 from game import Game
-from ui import ClientUI
+from game.cache import BoardCache, get_default_path
+
+
+def signal_ready(fd):
+    """Tell the launcher that the client is connected
+    """
+    with os.fdopen(fd, 'wb') as f:
+        f.write(b'ready\n')
 
 
 def main():
@@ -16,31 +25,34 @@ def main():
     logging.basicConfig(level=log_level)
     logger = logging.getLogger('CLIENT')
 
-    game = Game(args.address, args.port)
+    board_cache = None
+    if not args.no_board_cache:
+        try:
+            board_cache = BoardCache(args.board_cache or get_default_path(), args.board_cache_size)
+        except OSError as e:
+            logger.warning("Boards will not be cached: {0}".format(e))
+    ready = None
+    if args.ready_fd is not None:
+        ready = lambda: signal_ready(args.ready_fd)
 
     if args.ai:
-        if args.ai == 1:
-            from ai.ai1 import AI
-        elif args.ai == 2:
-            from ai.ai2 import AI
-        elif args.ai == 3:
-            from ai.ai3 import AI
-        elif args.ai == 4:
-            from ai.ai4 import AI
-        elif args.ai == 5:
-            from ai.ai5 import AI
-        elif args.ai == 6:
-            from ai.ai6 import AI
-        elif args.ai == 7:
-            from ai.ai7 import AI
-        else:
+        AI = get_ai(args.ai)
+        if not AI:
             logging.error("No AI version {0}.".format(args.ai))
             exit(1)
 
+        game = Game(args.address, args.port, encoding=args.encoding, board_cache=board_cache,
+                    geometry=False, ready=ready)
         ai = AI(game)
         ai.run()
 
     else:
+        # AI clients never import Qt
+        from PyQt5.QtWidgets import QApplication
+        from ui import ClientUI
+
+        game = Game(args.address, args.port, encoding=args.encoding, board_cache=board_cache,
+                    ready=ready)
         app = QApplication(sys.argv)
         ui = ClientUI(game)
         sys.exit(app.exec_())
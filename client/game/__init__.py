@@ -1,10 +1,13 @@
-import json
+import base64
 from json.decoder import JSONDecodeError
 import logging
 import socket
-from queue import Queue
-from time import sleep
+from queue import Empty, Queue
+from time import monotonic, sleep
 
+from common.codec import PROTOCOL_VERSION, get_codec, json_encode
+from common.framing import encode_frame
+from common.geometry import decode_board
 from game.board import Board
 from game.player import Player
 from socket_listener import SocketListener
@@ -13,7 +16,7 @@ from socket_listener import SocketListener
 class Game(object):
     """Represantation of the game state
     """
-    def __init__(self, addr, port):
+    def __init__(self, addr, port, encoding='json', board_cache=None, geometry=True, ready=None):
         """
         Parameters
         ----------
@@ -21,8 +24,21 @@ class Game(object):
             Server address
         port : int
             Server port
+        encoding : str
+            Preferred encoding of messages, 'json' or 'msgpack'
+        board_cache : BoardCache
+            Cache of boards received from the server, boards are not
+            cached if None
+        geometry : bool
+            The client needs coordinates of the hexes to draw the board,
+            AI clients get only adjacency of the areas if False
+        ready : function
+            Called once the client is connected to the server and waits
+            for the game to start
         """
         self.logger = logging.getLogger('CLIENT')
+        self.board_cache = board_cache
+        self.geometry = geometry
 
         self.buffer = 65535
         self.battle_in_progress = False
@@ -31,51 +47,132 @@ class Game(object):
         self.server_port = port
         self.players = {}
 
-        i = 0
-        while True:
-            try:
-                self.init_socket()
-                break
-            except ConnectionRefusedError as e:
-                if i > 100:
-                    self.logger.error("Connection to server refused: {0}".format(e))
-                    exit(1)
-                i += 1
-                sleep(0.01)
-
+        self.connect()
         self.start_socket_daemon()
-        while self.input_queue.empty():
-            pass
-        msg = self.input_queue.get()
+        self.handshake(encoding)
+        if ready:
+            ready()
+        msg = self.wait_for_message()
 
         self.logger.debug("Received message: {0}\n".format(msg)) #TODO
+        self.init_game(msg)
+
+    ##################
+    # INITIALIZATION #
+    ##################
+    def init_game(self, msg):
+        """Initialize the game state from the game_start message
+
+        Parameters
+        ----------
+        msg : dict
+            Message from the server
+        """
         if msg['type'] == 'game_start':
             self.player_name = msg['player']
             self.add_players(int(msg['no_players']), msg['score'])
-            self.board = Board(msg['areas'], msg['board'])
+            self.board = Board(msg['areas'], self.get_geometry(msg))
             self.current_player = self.players[msg['current_player']]
             self.current_player_name = msg['current_player']
-            self.players_order = msg['order']
+            self.players_order = list(msg['order'])
+            self.seq = msg.get('seq', 0)
+            self.synchronized = True
         else:
             self.logger.error("Did not receive game state from server.")
             exit(1)
 
-    ##################
-    # INITIALIZATION #
-    ##################
+    def get_geometry(self, msg):
+        """Get board of the game_start message
+
+        The server sends the encoded board only if the client does not
+        have it cached, otherwise the board is loaded from the cache.
+
+        Parameters
+        ----------
+        msg : dict
+            The game_start message
+
+        Returns
+        -------
+        dict
+            Board in the form created by BoardGenerator
+        """
+        if 'board' in msg:
+            data = base64.b64decode(msg['board'])
+            if self.board_cache:
+                self.board_cache.store(msg['board_id'], data)
+            return decode_board(data)
+
+        board = self.board_cache.load(msg['board_id']) if self.board_cache else None
+        if board is None:
+            self.logger.error("Board {0} is not cached.".format(msg['board_id']))
+            exit(1)
+        return board
+
     def add_players(self, number_of_players, score):
         """Create Players instances
         
         Parameters
         ----------
         number_of_players : int
-        score : list of int
+        score : dict of int: int
             Initial scores of all players
         """
         self.number_of_players = number_of_players
 
-        for i in range(1, number_of_players + 1):
-            self.players[i] = Player(i, score[str(i)])
+        for name in score:
+            self.players[int(name)] = Player(name, score[name])
+
+    ################
+    # STATE UPDATE #
+    ################
+    def apply_state(self, msg):
+        """Apply full game state from the game_state message
+
+        Parameters
+        ----------
+        msg : dict
+        """
+        for name, area in msg['areas'].items():
+            area_object = self.board.get_area(name)
+            area_object.set_owner(area['owner'])
+            area_object.set_dice(area['dice'])
+        self.set_scores(msg['score'])
+
+        for name, reserve in msg.get('reserves', {}).items():
+            self.players[int(name)].set_reserve(reserve)
+
+        self.current_player_name = msg['current_player']
+        self.current_player = self.players[msg['current_player']]
+        self.seq = msg['seq']
+        self.synchronized = True
+
+    def check_sequence(self, msg):
+        """Check that no state update was missed
+
+        A game state is requested from the server once the game
+        gets out of sync.
+
+        Parameters
+        ----------
+        msg : dict
+            Battle or end_turn message
+        """
+        if msg['seq'] != self.seq + 1:
+            self.logger.warning("Expected state {0}, got {1}.".format(self.seq + 1, msg['seq']))
+            self.synchronized = False
+        self.seq = msg['seq']
+
+    def set_scores(self, scores):
+        """Set scores of players
+
+        Parameters
+        ----------
+        scores : dict of str: int
+            Scores of (some of) the players
+        """
+        for name, score in scores.items():
+            self.players[int(name)].set_score(score)
 
     ##############
     # NETWORKING #
@@ -91,8 +188,33 @@ class Game(object):
         defender : int
             Name of defending area
         """
+        msg = self.create_message(type, attacker=attacker, defender=defender)
+
+        try:
+            self.socket.sendall(encode_frame(self.encode(msg)))
+        except BrokenPipeError:
+            self.logger.error("Connection to server broken.")
+            exit(1)
+
+    def create_message(self, type, attacker=None, defender=None):
+        """Create message for the server
+
+        Parameters
+        ----------
+        type : str
+        attacker : int
+            Name of attacking area
+        defender : int
+            Name of defending area
+
+        Returns
+        -------
+        dict
+        """
         if type == 'close':
             msg = {'type': 'close'}
+        elif type == 'resync':
+            msg = {'type': 'resync'}
         elif type == 'battle':
             msg = {
                 'type': 'battle',
@@ -102,12 +224,73 @@ class Game(object):
         elif type == 'end_turn':
             msg = {'type': 'end_turn'}
             self.logger.debug("Sending end_turn message.")
+        return msg
 
-        try:
-            self.socket.send(str.encode(json.dumps(msg)))
-        except BrokenPipeError:
-            self.logger.error("Connection to server broken.")
+    def close_socket(self):
+        """Close connection to the server
+        """
+        self.socket.close()
+
+    def handshake(self, encoding):
+        """Agree with the server on protocol version and encoding of messages
+
+        Parameters
+        ----------
+        encoding : str
+            Preferred encoding
+        """
+        encodings = [encoding] if encoding == 'json' else [encoding, 'json']
+        self.socket.sendall(encode_frame(json_encode({
+            'type': 'hello',
+            'version': PROTOCOL_VERSION,
+            'encodings': encodings,
+            'boards': self.board_cache.get_fingerprints() if self.board_cache else [],
+            'geometry': self.geometry,
+        })))
+
+        msg = self.wait_for_message()
+        if msg['type'] != 'hello' or not msg['encoding']:
+            self.logger.error("Server does not support protocol version {0}.".format(PROTOCOL_VERSION))
             exit(1)
+        self.encode = get_codec(msg['encoding'])[0]
+
+    def wait_for_message(self):
+        """Wait for a message from the server
+
+        Returns
+        -------
+        dict
+        """
+        while True:
+            try:
+                return self.input_queue.get(timeout=1.0)
+            except Empty:
+                if not self.socket_listener.is_alive():
+                    self.logger.error("Connection to server closed.")
+                    exit(1)
+
+    def connect(self, timeout=10.0):
+        """Connect to the server, retrying with exponential backoff
+        while the server is starting
+
+        Parameters
+        ----------
+        timeout : float
+            Seconds to wait for the server
+        """
+        deadline = monotonic() + timeout
+        delay = 0.005
+        while True:
+            try:
+                self.init_socket()
+                return
+            except ConnectionRefusedError as e:
+                if monotonic() + delay > deadline:
+                    self.logger.error("Connection to server refused: {0}".format(e))
+                    exit(1)
+                self.socket.close()
+                sleep(delay)
+                delay = min(2 * delay, 0.5)
 
     def init_socket(self):
         """Socket initialization
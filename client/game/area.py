@@ -1,28 +1,27 @@
-import hexutil
 import logging
 
 
 class Area(object):
     """Game board area
     """
-    def __init__(self, name, owner, dice, neighbours, hexes):
+    def __init__(self, name, board, neighbours, hexes):
         """
         Parameters
         ----------
         name : int
-        owner : int
-        dice : int
+        board : Board
+            Board storing owner and dice of the area
         neighbours : list of int
         hexes : list of list of int
-            Hex coordinates of for all Area's hexes
+            Hex coordinates of for all Area's hexes, None if the client
+            does not draw the board
         """
         self.logger = logging.getLogger('CLIENT')
 
         self.name = int(name)
-        self.owner_name = int(owner)
-        self.dice = int(dice)
+        self.board = board
         self.neighbours = [int(n) for n in neighbours]
-        self.hexes = [[int(i) for i in h] for h in hexes]
+        self.hexes = [[int(i) for i in h] for h in hexes] if hexes else None
 
     def get_adjacent_areas(self):
         """Return names of adjacent areas
@@ -32,7 +31,7 @@ class Area(object):
     def get_dice(self):
         """Return number of dice in the Area
         """
-        return self.dice
+        return self.board.dice[self.name]
 
     def get_name(self):
         """Return Area's name
@@ -42,24 +41,24 @@ class Area(object):
     def get_owner_name(self):
         """Return Area's owner's name
         """
-        return self.owner_name
+        return self.board.owners[self.name]
 
     def has_dice(self):
         """Return True if area has enough dice to attack
         """
-        return self.dice >= 2
+        return self.board.dice[self.name] >= 2
 
     def set_dice(self, dice):
         """Set area's dice
         """
-        self.dice = dice
+        self.board.set_dice(self.name, int(dice))
         if dice < 1 or dice > 8:
             self.logger.error("Area {0} dice set to {1}.".format(self.name, dice))
 
     def set_owner(self, name):
         """Set owner name
         """
-        self.owner_name = int(name)
+        self.board.set_owner(self.name, int(name))
 
     ##############
     # UI METHODS #
@@ -67,4 +66,6 @@ class Area(object):
     def get_hexes(self):
         """Return Hex objects of the Area
         """
+        import hexutil
+
         return [hexutil.Hex(h[0], h[1]) for h in self.hexes]
@@ -1,3 +1,4 @@
+from array import array
 import logging
 
 from game.area import Area
@@ -5,6 +6,11 @@ from game.area import Area
 
 class Board(object):
     """Game board
+
+    Owners and dice of the areas are stored in flat arrays indexed by
+    area's name. Dice, areas and frontier of each player are updated
+    whenever an area changes, so that they can be queried without
+    scanning the board.
     """
     def __init__(self, areas, board):
         """
@@ -12,25 +18,148 @@ class Board(object):
         ----------
         areas : dict of int: list of int
             Dictionary of game areas and their neighbours
-        board : dict
-            Dictionary describing the game's board
+        board : dict of int: dict
+            Dictionary describing the game's board, hexes of the areas
+            are empty if the client needs no geometry
+
+        Attributes
+        ----------
+        areas : dict of int: Area
+        owners : array of int
+            Owner of each area, 0 if there is no such area
+        dice : array of int
+            Number of dice in each area
+        player_dice : dict of int: int
+            Number of dice in the areas of each player
+        player_areas : dict of int: set of int
+            Names of the areas of each player
+        frontiers : dict of int: set of int
+            Names of the areas of each player adjacent to an opponent's area
+        observers : list of function
+            Called with name, old and new owner whenever an area changes
+            its owner, see add_observer
         """
         self.logger = logging.getLogger('CLIENT')
+
+        size = max(int(area) for area in areas) + 1 if areas else 1
+        self.owners = array('B', bytes(size))
+        self.dice = array('B', bytes(size))
+        self.player_dice = {}
+        self.player_areas = {}
+        self.frontiers = {}
+        self.observers = []
+
         self.areas = {}
         for area in areas:
-            self.areas[area] = Area(area, areas[area]['owner'], areas[area]['dice'],
-                                    board[area]['neighbours'], board[area]['hexes'])
+            name = int(area)
+            geometry = board[name]
+            self.areas[name] = Area(name, self, geometry['neighbours'], geometry['hexes'] or None)
+
+            owner = int(areas[area]['owner'])
+            dice = int(areas[area]['dice'])
+            self.owners[name] = owner
+            self.dice[name] = dice
+            self.player_dice[owner] = self.player_dice.get(owner, 0) + dice
+            self.player_areas.setdefault(owner, set()).add(name)
+
+        for name in self.areas:
+            self.update_frontier(name)
 
     def get_area(self, idx):
         """Get Area given its name
         """
-        return self.areas[str(idx)]
+        return self.areas[int(idx)]
 
     def get_player_dice(self, player):
         """Get all dice of a single player
         """
-        dice = 0
-        for area in self.areas.values():
-            if area.get_owner_name() == player:
-                dice += area.get_dice()
-        return dice
+        return self.player_dice.get(player, 0)
+
+    def get_player_areas(self, player):
+        """Get names of areas of a single player
+
+        Returns
+        -------
+        set of int
+            The set is updated as the game goes on and must not be modified
+        """
+        return self.player_areas.setdefault(player, set())
+
+    def get_number_of_areas(self, player):
+        """Get number of areas of a single player
+        """
+        return len(self.player_areas.get(player, ()))
+
+    def get_frontier(self, player):
+        """Get names of areas of a single player that are adjacent to
+        an opponent's area
+
+        Returns
+        -------
+        set of int
+            The set is updated as the game goes on and must not be modified
+        """
+        return self.frontiers.setdefault(player, set())
+
+    def add_observer(self, observer):
+        """Register a function called whenever an area changes its owner
+
+        Parameters
+        ----------
+        observer : function
+            Called with name of the area, its old and new owner once the
+            aggregates of the board are updated
+        """
+        self.observers.append(observer)
+
+    def set_owner(self, name, owner):
+        """Change owner of an area, see Area.set_owner
+
+        Parameters
+        ----------
+        name : int
+        owner : int
+        """
+        old = self.owners[name]
+        if old == owner:
+            return
+        dice = self.dice[name]
+        self.player_dice[old] -= dice
+        self.player_dice[owner] = self.player_dice.get(owner, 0) + dice
+        self.player_areas[old].discard(name)
+        self.player_areas.setdefault(owner, set()).add(name)
+        self.frontiers.setdefault(old, set()).discard(name)
+        self.owners[name] = owner
+
+        self.update_frontier(name)
+        for n in self.areas[name].neighbours:
+            self.update_frontier(n)
+
+        for observer in self.observers:
+            observer(name, old, owner)
+
+    def set_dice(self, name, dice):
+        """Change number of dice in an area, see Area.set_dice
+
+        Parameters
+        ----------
+        name : int
+        dice : int
+        """
+        self.player_dice[self.owners[name]] += dice - self.dice[name]
+        self.dice[name] = dice
+
+    def update_frontier(self, name):
+        """Add an area to or remove it from its owner's frontier
+
+        Parameters
+        ----------
+        name : int
+        """
+        owner = self.owners[name]
+        frontier = self.frontiers.setdefault(owner, set())
+        for n in self.areas[name].neighbours:
+            if self.owners[n] != owner:
+                frontier.add(name)
+                return
+        frontier.discard(name)
@@ -0,0 +1,137 @@
+import logging
+import os
+import string
+
+from common.geometry import decode_board, hash_data
+
+
+def get_default_path():
+    """Get the default directory of the board cache
+
+    Returns
+    -------
+    str
+    """
+    cache = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(cache, 'dicewars', 'boards')
+
+
+class BoardCache(object):
+    """Boards received from the server stored in a directory
+
+    Every board is stored in its own file named by its fingerprint,
+    encoded by geometry.encode_board. Modification time of a file is the
+    last time the board was used; the least recently used boards are
+    removed once there are more than size boards.
+    """
+    def __init__(self, path, size=256):
+        """
+        Parameters
+        ----------
+        path : str
+            Directory of the cache, created if it does not exist
+        size : int
+            Largest number of cached boards
+
+        Attributes
+        ----------
+        fingerprints : list of str
+            Fingerprints of the cached boards, from the least recently used
+        """
+        self.logger = logging.getLogger('CLIENT')
+        self.path = path
+        self.size = size
+        os.makedirs(path, exist_ok=True)
+
+        boards = []
+        for name in os.listdir(path):
+            if len(name) == 16 and all(c in string.hexdigits for c in name):
+                try:
+                    boards.append((os.stat(os.path.join(path, name)).st_mtime, name))
+                except OSError:
+                    pass
+        self.fingerprints = [name for mtime, name in sorted(boards)]
+        self.evict()
+
+    def get_fingerprints(self):
+        """Get fingerprints of the cached boards
+
+        Returns
+        -------
+        list of str
+        """
+        return sorted(self.fingerprints)
+
+    def load(self, fingerprint):
+        """Load a cached board
+
+        Parameters
+        ----------
+        fingerprint : str
+
+        Returns
+        -------
+        dict
+            Board in the form created by BoardGenerator, None if it is
+            not cached
+        """
+        path = os.path.join(self.path, fingerprint)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            os.utime(path)
+        except OSError:
+            return None
+        if hash_data(data) != fingerprint:
+            self.logger.warning("Cached board {0} is corrupted.".format(fingerprint))
+            return None
+        self.touch(fingerprint)
+        return decode_board(data)
+
+    def store(self, fingerprint, data):
+        """Store a board
+
+        The board is written to a temporary file first, so that clients
+        running at the same time never read a partially written board.
+
+        Parameters
+        ----------
+        fingerprint : str
+        data : bytes
+            Board encoded by geometry.encode_board
+        """
+        if hash_data(data) != fingerprint:
+            self.logger.warning("Board does not match its fingerprint {0}.".format(fingerprint))
+            return
+        path = os.path.join(self.path, fingerprint)
+        temp = "{0}.{1}".format(path, os.getpid())
+        try:
+            with open(temp, 'wb') as f:
+                f.write(data)
+            os.replace(temp, path)
+        except OSError as e:
+            self.logger.warning("Cannot cache board {0}: {1}".format(fingerprint, e))
+            return
+        self.touch(fingerprint)
+        self.evict()
+
+    def touch(self, fingerprint):
+        """Mark a board as the most recently used
+
+        Parameters
+        ----------
+        fingerprint : str
+        """
+        if fingerprint in self.fingerprints:
+            self.fingerprints.remove(fingerprint)
+        self.fingerprints.append(fingerprint)
+
+    def evict(self):
+        """Remove the least recently used boards above the size of the cache
+        """
+        while len(self.fingerprints) > self.size:
+            fingerprint = self.fingerprints.pop(0)
+            try:
+                os.remove(os.path.join(self.path, fingerprint))
+            except OSError:
+                pass
@@ -0,0 +1,90 @@
+import logging
+
+from game import Game
+
+
+class LocalGame(Game):
+    """Representation of the game state of a client running in the same
+    process as the server
+    """
+    def __init__(self, msg):
+        """
+        Parameters
+        ----------
+        msg : dict
+            The game_start message
+
+        Attributes
+        ----------
+        outgoing : dict
+            Last message sent to the server
+        """
+        self.logger = logging.getLogger('CLIENT')
+
+        self.battle_in_progress = False
+        self.players = {}
+        self.outgoing = None
+        self.board_cache = None
+
+        self.init_game(msg)
+
+    def send_message(self, type, attacker=None, defender=None):
+        """Store message for the server
+        """
+        self.outgoing = self.create_message(type, attacker=attacker, defender=defender)
+
+    def close_socket(self):
+        """There is no socket to close
+        """
+        pass
+
+
+class LocalAgent(object):
+    """AI agent playing the game in the same process as the server
+
+    Messages are passed as the server creates them, without encoding, so
+    names of areas and players are integers as in messages decoded from
+    MessagePack. Messages are shared with other agents and are never
+    modified.
+    """
+    def __init__(self, ai):
+        """
+        Parameters
+        ----------
+        ai : class
+            AI class derived from GenericAI
+        """
+        self.logger = logging.getLogger('AI')
+        self.ai_class = ai
+        self.ai = None
+        self.game = None
+
+    def handle_message(self, msg):
+        """Process message from the server
+
+        Parameters
+        ----------
+        msg : dict
+        """
+        if msg['type'] == 'game_start':
+            self.game = LocalGame(msg)
+            self.ai = self.ai_class(self.game)
+        elif self.ai:
+            self.ai.handle_server_message(msg)
+
+    def get_turn(self):
+        """Let the AI make its move
+
+        Returns
+        -------
+        dict
+            Command for the server
+        """
+        self.game.outgoing = None
+        if not self.game.synchronized:
+            return self.game.create_message('resync')
+        self.ai.ai_turn()
+        if not self.game.outgoing:
+            self.logger.error("AI did not make a move.")
+            self.game.outgoing = self.game.create_message('end_turn')
+        return self.game.outgoing
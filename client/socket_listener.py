@@ -1,10 +1,12 @@
 import sys
 import logging
 
-from json import loads
 from threading import Thread
 from json import JSONDecodeError
 
+from common.codec import get_codec, json_decode
+from common.framing import FrameBuffer
+
 
 class SocketListener(Thread):
     """Daemon for collecting messages from the server
@@ -24,31 +26,31 @@ class SocketListener(Thread):
         self.socket = sock
         self.queue = queue
         self.buffer = buffer
+        self.decode = json_decode
 
     def run(self):
         """Collect messages from the server
+
+        Messages are decoded as JSON until the server chooses encoding
+        in its hello message.
         """
-        buffer = ''
+        frames = FrameBuffer()
         while True:
             try:
-                data = self.socket.recv(self.buffer).decode()
-                messages = data.split('\0')
-                for msg in messages:
-                    if not msg:
-                        continue
-                    buffer += msg
+                data = self.socket.recv(self.buffer)
+                if not data:
+                    exit(1)
+                frames.feed(data)
+                for frame in frames.get_frames():
                     try:
-                        data = loads(buffer)
+                        data = self.decode(frame)
+                        if data['type'] == 'hello' and data['encoding']:
+                            self.decode = get_codec(data['encoding'])[1]
                         if data['type'] == 'end_game':
                             self.socket.close()
                         self.queue.put(data)
-                        buffer = ''
-                    except JSONDecodeError as e:
-                        self.logger.warning("buffer: {0}\nmsg: {1}\nJSONDecodeError: {2}".format(buffer, msg, e))
-                        self.logger.warning("JSONDecodeError: {0}\nmsg: {1}".format(e, msg))
-                    except JSONError as e:
-                        self.logger.warning("buffer: {0}\nmsg: {1}".format(buffer, msg, e))
-                        self.logger.warning("JSONError: {0}\nmsg: {1}\nJSONError: {2}".format(e, msg))
+                    except (JSONDecodeError, ValueError, IndexError) as e:
+                        self.logger.warning("Cannot decode message: {0}\nmsg: {1}".format(e, frame))
 
             except (ConnectionResetError, OSError):
                 exit(1)
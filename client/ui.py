@@ -1,3 +1,4 @@
+import colorsys
 import hexutil
 import json
 from json.decoder import JSONDecodeError
@@ -10,19 +11,28 @@ from time import sleep
 import sys
 
 
+COLORS = {
+    1 : (0, 255, 0),
+    2 : (0, 0, 255),
+    3 : (255, 0, 0),
+    4 : (255, 255, 0),
+    5 : (0, 255, 255),
+    6 : (255, 0, 255),
+    7 : (224, 224, 224),
+    8 : (153, 153, 255)
+}
+
+
 def player_color(player_name):
     """Return color of a player given his name
+
+    Players beyond the eighth get hues spread by the golden ratio.
     """
-    return {
-        1 : (0, 255, 0),
-        2 : (0, 0, 255),
-        3 : (255, 0, 0),
-        4 : (255, 255, 0),
-        5 : (0, 255, 255),
-        6 : (255, 0, 255),
-        7 : (224, 224, 224),
-        8 : (153, 153, 255)
-    }[player_name]
+    if player_name in COLORS:
+        return COLORS[player_name]
+    hue = (player_name * 0.618033988749895) % 1.0
+    value = 1.0 if player_name % 2 else 0.75
+    return tuple(int(255 * c) for c in colorsys.hsv_to_rgb(hue, 0.6, value))
 
 
 class MainWindow(QWidget):
@@ -41,9 +51,20 @@ class MainWindow(QWidget):
         self.game = game
         self.board = game.board
         self.areas_mapping = {}
+        self.borders = {}
         for i, area in self.board.areas.items():
-            for h in area.get_hexes():
+            hexes = set(area.get_hexes())
+            for h in hexes:
                 self.areas_mapping[h] = i
+            self.borders[i] = [(h, n) for h in area.get_hexes() for n in h.neighbours() if n not in hexes]
+
+        # extent of the board in hex coordinates, the board is centered at hex (0, 0)
+        self.extent = (
+            max(abs(h.x) for h in self.areas_mapping) + 1,
+            max(abs(h.y) for h in self.areas_mapping),
+        )
+        self.hexgrid = None
+        self.lines = {}
 
         self.font = QFont('Helvetica', 16)
         self.pen = QPen()
@@ -66,14 +87,12 @@ class MainWindow(QWidget):
         x = size.width()
         y = size.height()
 
-        bbox = hexutil.Rectangle(-x // 2, -y // 2, x, y)
-        hexgrid = hexutil.HexGrid(10)
+        hexgrid = self.get_hexgrid()
 
         self.qp.setPen(Qt.NoPen)
         self.qp.translate(x // 2, y // 2)
 
         for k, area in self.board.areas.items():
-            lines = []
             first_hex = True
 
             color = player_color(area.get_owner_name())
@@ -97,13 +116,10 @@ class MainWindow(QWidget):
                     first_hex = False
                     self.qp.restore()
 
-                for n in h.neighbours():
-                    if n not in area.get_hexes():
-                        line = []
-                        for corner in hexgrid.corners(h):
-                            if corner in hexgrid.corners(n):
-                                line.append(corner)
-                        lines.append(line)
+            if k not in self.lines:
+                self.lines[k] = [[c for c in hexgrid.corners(h) if c in hexgrid.corners(n)]
+                                 for h, n in self.borders[k]]
+            lines = self.lines[k]
 
             self.qp.save()
             pen = QPen()
@@ -144,9 +160,28 @@ class MainWindow(QWidget):
         size = self.size()
         x = size.width()//2
         y = size.height()//2
-        hexgrid = hexutil.HexGrid(10)
+        hexgrid = self.get_hexgrid()
         return hexgrid.hex_at_coordinate(position.x() - x, position.y() - y)
 
+    def get_hexgrid(self):
+        """Return hex grid fitting the board into the window
+
+        Hexes are 10 pixels wide unless the board does not fit, borders
+        of the areas are recomputed only when the hex size changes.
+        """
+        size = self.size()
+        width = min(
+            10,
+            size.width() // (2 * self.extent[0]),
+            int(size.height() * 3 ** 0.5 / (2 * (3 * self.extent[1] + 2))),
+        )
+        width = max(width, 2)
+        if self.hexgrid is None or self.hexgrid.width != width:
+            self.hexgrid = hexutil.HexGrid(width)
+            self.lines = {}
+            self.font = QFont('Helvetica', max(6, 16 * width // 10))
+        return self.hexgrid
+
 
 class Battle(QWidget):
     """Widget for displaying battle results
@@ -287,10 +322,17 @@ class ClientUI(QWidget):
         Parameters
         ----------
         game : Game
+
+        Attributes
+        ----------
+        resync_pending : bool
+            Indicates whether the game state was requested and has not
+            arrived yet
         """
         super(ClientUI, self).__init__()
         self.logger = logging.getLogger('GUI')
         self.game = game
+        self.resync_pending = False
         self.window_name = 'Dice Wars - Player ' + str(self.game.player_name)
         self.init_ui()
 
@@ -355,11 +397,12 @@ class ClientUI(QWidget):
             exit(1)
 
         if msg['type'] == 'battle':
+            self.game.check_sequence(msg)
             self.game.draw_battle = True
             atk_data = msg['result']['atk']
             def_data = msg['result']['def']
             self.logger.debug(type(atk_data['name']))
-            attacker = self.game.board.get_area(str(atk_data['name']))
+            attacker = self.game.board.get_area(atk_data['name'])
             attacker.set_dice(atk_data['dice'])
             atk_name = attacker.get_owner_name()
 
@@ -369,8 +412,7 @@ class ClientUI(QWidget):
 
             if def_data['owner'] == atk_data['owner']:
                 defender.set_owner(atk_data['owner'])
-                self.game.players[atk_name].set_score(msg['score'][str(atk_name)])
-                self.game.players[def_name].set_score(msg['score'][str(def_name)])
+                self.game.set_scores(msg['score'])
 
             self.game.battle = {
                 'atk_name' : atk_name,
@@ -380,6 +422,7 @@ class ClientUI(QWidget):
             }
 
         elif msg['type'] == 'end_turn':
+            self.game.check_sequence(msg)
             self.logger.debug(msg)
             areas_to_redraw = []
             for area in msg['areas']:
@@ -402,8 +445,12 @@ class ClientUI(QWidget):
             self.game.battle = False
             self.game.players[self.game.current_player_name].activate()
 
-            for i, player in self.game.players.items():
-                player.set_reserve(msg['reserves'][str(i)])
+            for i, reserve in msg['reserves'].items():
+                self.game.players[int(i)].set_reserve(reserve)
+
+        elif msg['type'] == 'game_state':
+            self.game.apply_state(msg)
+            self.resync_pending = False
 
         elif msg['type'] == 'game_end':
             if msg['winner'] == self.game.player_name:
@@ -420,6 +467,9 @@ class ClientUI(QWidget):
 
         if self.game.player_name == self.game.current_player.get_name():
             self.end_turn.setEnabled(True)
+            if not self.game.synchronized and not self.resync_pending:
+                self.game.send_message('resync')
+                self.resync_pending = True
         else:
             self.end_turn.setEnabled(False)
 
@@ -0,0 +1,286 @@
+import json
+import struct
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+PROTOCOL_VERSION = 2
+
+# errors raised by decoders of malformed messages; JSONDecodeError is a ValueError
+DECODE_ERRORS = (ValueError, IndexError, struct.error)
+
+
+def json_encode(msg):
+    """Encode message as JSON
+    """
+    return json.dumps(msg).encode()
+
+
+def json_decode(data):
+    """Decode JSON message
+    """
+    return json.loads(data)
+
+
+def json_extend(data, fields):
+    """Add fields to an encoded JSON message, see extend_message
+    """
+    if data == b'{}':
+        return json_encode(fields)
+    return json_encode(fields)[:-1] + b', ' + data[1:]
+
+
+def pack(obj):
+    """Encode object in MessagePack format
+
+    Only types used in messages are supported: None, bool, int, float,
+    str, list, tuple and dict.
+
+    Parameters
+    ----------
+    obj : object
+
+    Returns
+    -------
+    bytes
+    """
+    out = bytearray()
+    _pack(obj, out)
+    return bytes(out)
+
+
+def _pack(obj, out):
+    if obj is None:
+        out.append(0xc0)
+    elif obj is True:
+        out.append(0xc3)
+    elif obj is False:
+        out.append(0xc2)
+    elif isinstance(obj, int):
+        if 0 <= obj < 0x80:
+            out.append(obj)
+        elif -0x20 <= obj < 0:
+            out.append(obj & 0xff)
+        elif 0 <= obj <= 0xffffffff:
+            out += struct.pack('>BI', 0xce, obj)
+        else:
+            out += struct.pack('>Bq', 0xd3, obj)
+    elif isinstance(obj, float):
+        out += struct.pack('>Bd', 0xcb, obj)
+    elif isinstance(obj, str):
+        data = obj.encode()
+        if len(data) < 0x20:
+            out.append(0xa0 | len(data))
+        else:
+            out += struct.pack('>BI', 0xdb, len(data))
+        out += data
+    elif isinstance(obj, (list, tuple)):
+        if len(obj) < 0x10:
+            out.append(0x90 | len(obj))
+        else:
+            out += struct.pack('>BI', 0xdd, len(obj))
+        for item in obj:
+            _pack(item, out)
+    elif isinstance(obj, dict):
+        out += map_header(len(obj))
+        for key, value in obj.items():
+            _pack(key, out)
+            _pack(value, out)
+    else:
+        raise TypeError("Cannot pack {0}".format(type(obj)))
+
+
+def map_header(length):
+    """Get MessagePack header of a map of the given length
+    """
+    if length < 0x10:
+        return bytes([0x80 | length])
+    return struct.pack('>BI', 0xdf, length)
+
+
+def unpack(data):
+    """Decode object from MessagePack format, see pack
+
+    Parameters
+    ----------
+    data : bytes
+
+    Returns
+    -------
+    object
+    """
+    return _unpack(data, 0)[0]
+
+
+def _unpack(data, pos):
+    byte = data[pos]
+    pos += 1
+    if byte < 0x80:
+        return byte, pos
+    elif byte >= 0xe0:
+        return byte - 0x100, pos
+    elif byte & 0xe0 == 0xa0:
+        end = pos + (byte & 0x1f)
+        return data[pos:end].decode(), end
+    elif byte & 0xf0 == 0x90:
+        return _unpack_array(data, pos, byte & 0x0f)
+    elif byte & 0xf0 == 0x80:
+        return _unpack_map(data, pos, byte & 0x0f)
+    elif byte == 0xc0:
+        return None, pos
+    elif byte == 0xc2:
+        return False, pos
+    elif byte == 0xc3:
+        return True, pos
+    elif byte in FORMATS:
+        fmt = FORMATS[byte]
+        value = fmt.unpack_from(data, pos)[0]
+        pos += fmt.size
+        if byte in (0xd9, 0xda, 0xdb):
+            return data[pos:pos + value].decode(), pos + value
+        elif byte in (0xdc, 0xdd):
+            return _unpack_array(data, pos, value)
+        elif byte in (0xde, 0xdf):
+            return _unpack_map(data, pos, value)
+        return value, pos
+    raise ValueError("Unsupported MessagePack type 0x{0:02x}".format(byte))
+
+
+def _unpack_array(data, pos, length):
+    items = []
+    for i in range(length):
+        item, pos = _unpack(data, pos)
+        items.append(item)
+    return items, pos
+
+
+def _unpack_map(data, pos, length):
+    items = {}
+    for i in range(length):
+        key, pos = _unpack(data, pos)
+        items[key], pos = _unpack(data, pos)
+    return items, pos
+
+
+FORMATS = {
+    0xca: struct.Struct('>f'),
+    0xcb: struct.Struct('>d'),
+    0xcc: struct.Struct('>B'),
+    0xcd: struct.Struct('>H'),
+    0xce: struct.Struct('>I'),
+    0xcf: struct.Struct('>Q'),
+    0xd0: struct.Struct('>b'),
+    0xd1: struct.Struct('>h'),
+    0xd2: struct.Struct('>i'),
+    0xd3: struct.Struct('>q'),
+    0xd9: struct.Struct('>B'),
+    0xda: struct.Struct('>H'),
+    0xdb: struct.Struct('>I'),
+    0xdc: struct.Struct('>H'),
+    0xdd: struct.Struct('>I'),
+    0xde: struct.Struct('>H'),
+    0xdf: struct.Struct('>I'),
+}
+
+
+if msgpack:
+    def msgpack_encode(msg):
+        """Encode message in MessagePack format
+        """
+        return msgpack.packb(msg)
+
+    def msgpack_decode(data):
+        """Decode message in MessagePack format
+        """
+        return msgpack.unpackb(data, strict_map_key=False)
+else:
+    msgpack_encode = pack
+    msgpack_decode = unpack
+
+
+def msgpack_extend(data, fields):
+    """Add fields to an encoded MessagePack message, see extend_message
+    """
+    byte = data[0]
+    if byte & 0xf0 == 0x80:
+        length, pos = byte & 0x0f, 1
+    elif byte in (0xde, 0xdf):
+        fmt = FORMATS[byte]
+        length, pos = fmt.unpack_from(data, 1)[0], 1 + fmt.size
+    else:
+        raise ValueError("Message is not a map")
+
+    out = bytearray(map_header(length + len(fields)))
+    for key, value in fields.items():
+        out += msgpack_encode(key)
+        out += msgpack_encode(value)
+    out += data[pos:]
+    return bytes(out)
+
+
+ENCODINGS = {
+    'json': (json_encode, json_decode, json_extend),
+    'msgpack': (msgpack_encode, msgpack_decode, msgpack_extend),
+}
+
+
+def get_codec(encoding):
+    """Get encoder and decoder of messages
+
+    Parameters
+    ----------
+    encoding : str
+        Name of the encoding, 'json' or 'msgpack'
+
+    Returns
+    -------
+    (function, function, function)
+        Encoder of messages to bytes, decoder of bytes to messages and
+        extender of encoded messages, see extend_message
+    """
+    return ENCODINGS[encoding]
+
+
+def extend_message(codec, data, fields):
+    """Add fields to an encoded message without decoding it
+
+    Messages shared by many recipients are encoded once, and fields
+    specific to a recipient are added to the encoded message.
+
+    Parameters
+    ----------
+    codec : (function, function, function)
+        Codec the message was encoded with, see get_codec
+    data : bytes
+        Encoded message, a dict whose keys differ from the new fields
+    fields : dict
+        Fields to be added
+
+    Returns
+    -------
+    bytes
+        Encoded message with the fields
+    """
+    return codec[2](data, fields)
+
+
+def choose_encoding(encodings):
+    """Choose the first supported encoding
+
+    Parameters
+    ----------
+    encodings : list of str
+        Encodings supported by the client in order of preference
+
+    Returns
+    -------
+    str
+        Name of the encoding, None if none of them is supported
+    """
+    for encoding in encodings:
+        if encoding in ENCODINGS:
+            return encoding
+    return None
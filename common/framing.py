@@ -0,0 +1,87 @@
+import struct
+
+
+HEADER = struct.Struct('!I')
+
+
+def encode_frame(payload):
+    """Prefix payload with its length
+
+    Parameters
+    ----------
+    payload : bytes
+
+    Returns
+    -------
+    bytes
+        Frame containing the payload
+    """
+    return HEADER.pack(len(payload)) + payload
+
+
+class FrameBuffer(object):
+    """Buffer splitting received data into frames
+
+    Every frame consists of a 4-byte big-endian length of the payload
+    followed by the payload itself.
+    """
+    def __init__(self):
+        """
+        Attributes
+        ----------
+        buffer : bytearray
+            Received data
+        start : int
+            Position of the first unprocessed byte in the buffer
+        """
+        self.buffer = bytearray()
+        self.start = 0
+
+    def feed(self, data):
+        """Add received data to the buffer
+
+        Parameters
+        ----------
+        data : bytes
+        """
+        if self.start == len(self.buffer):
+            self.buffer.clear()
+            self.start = 0
+        elif self.start > len(data):
+            del self.buffer[:self.start]
+            self.start = 0
+        self.buffer += data
+
+    def get_frame(self):
+        """Get payload of the next complete frame
+
+        Returns
+        -------
+        bytes
+            Payload of the frame, None if there is no complete frame
+        """
+        start = self.start + HEADER.size
+        if len(self.buffer) < start:
+            return None
+        end = start + HEADER.unpack_from(self.buffer, self.start)[0]
+        if len(self.buffer) < end:
+            return None
+
+        with memoryview(self.buffer) as view:
+            payload = bytes(view[start:end])
+        self.start = end
+        return payload
+
+    def get_frames(self):
+        """Get payloads of all complete frames
+
+        Returns
+        -------
+        list of bytes
+        """
+        frames = []
+        frame = self.get_frame()
+        while frame is not None:
+            frames.append(frame)
+            frame = self.get_frame()
+        return frames
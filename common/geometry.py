@@ -0,0 +1,88 @@
+from hashlib import blake2b
+import struct
+
+
+UINT16 = struct.Struct('<H')
+
+
+def encode_board(board):
+    """Encode board in the compact binary format of board libraries and messages
+
+    The board is encoded as the number of areas, then name, number of
+    hexes and number of adjacent areas of each area, then coordinates of
+    the hexes of all areas, and names of adjacent areas of all areas.
+    All numbers are 16-bit little-endian integers.
+
+    Parameters
+    ----------
+    board : dict
+        Board as created by BoardGenerator
+
+    Returns
+    -------
+    bytes
+    """
+    names = sorted(board)
+    sizes = [len(names)]
+    hexes = []
+    neighbours = []
+    for name in names:
+        area_hexes = board[name].get('hexes', [])
+        sizes.extend((name, len(area_hexes), len(board[name]['neighbours'])))
+        for h in area_hexes:
+            hexes.extend(h)
+        neighbours.extend(board[name]['neighbours'])
+
+    return (struct.pack('<{0}H'.format(len(sizes)), *sizes)
+            + struct.pack('<{0}h'.format(len(hexes)), *hexes)
+            + struct.pack('<{0}H'.format(len(neighbours)), *neighbours))
+
+
+def decode_board(data, offset=0):
+    """Decode board from the compact binary format, see encode_board
+
+    Parameters
+    ----------
+    data : bytes or mmap
+    offset : int
+        Position of the board in data
+
+    Returns
+    -------
+    dict
+        Board in the form created by BoardGenerator
+    """
+    count = UINT16.unpack_from(data, offset)[0]
+    offset += UINT16.size
+    sizes = struct.unpack_from('<{0}H'.format(3 * count), data, offset)
+    offset += 6 * count
+    total_hexes = sum(sizes[1::3])
+    hexes = struct.unpack_from('<{0}h'.format(2 * total_hexes), data, offset)
+    offset += 4 * total_hexes
+    neighbours = struct.unpack_from('<{0}H'.format(sum(sizes[2::3])), data, offset)
+
+    board = {}
+    h = n = 0
+    for i in range(count):
+        name, hex_count, neighbour_count = sizes[3 * i:3 * i + 3]
+        board[name] = {
+            'hexes': list(zip(hexes[h:h + 2 * hex_count:2], hexes[h + 1:h + 2 * hex_count:2])),
+            'neighbours': list(neighbours[n:n + neighbour_count]),
+        }
+        h += 2 * hex_count
+        n += neighbour_count
+    return board
+
+
+def hash_data(data):
+    """Get fingerprint identifying an encoded board
+
+    Parameters
+    ----------
+    data : bytes
+
+    Returns
+    -------
+    str
+    """
+    return blake2b(data, digest_size=8).hexdigest()
@@ -1,17 +1,51 @@
 #!/usr/bin/env python3
+import os
 import sys
 from signal import signal, SIGCHLD
 from subprocess import Popen
-from time import sleep
 from argparse import ArgumentParser
 
+from server.game.generator import PRESETS
+
 
 parser = ArgumentParser(prog='Dice_Wars')
-parser.add_argument('-n', '--number-of-players', help="Number of players.", type=int, default=2)
+parser.add_argument('-n', '--number-of-players', help="Number of players, 2 by default "
+                    "or given by the preset.", type=int)
 parser.add_argument('-p', '--port', help="Server port", type=int, default=5005)
 parser.add_argument('-a', '--address', help="Server address", default='127.0.0.1')
 parser.add_argument('--ai', help="Specify AI versions as a sequence of ints.",
                     type=int, nargs='+')
+parser.add_argument('--delta', help="Send only changes of the game state to clients.",
+                    action='store_true')
+parser.add_argument('--encoding', help="Encoding of messages preferred by clients.",
+                    choices=['json', 'msgpack'], default='json')
+parser.add_argument('--seed', help="Seed of the game, or of the first game of a tournament.",
+                    type=int)
+parser.add_argument('--record', help="Write record of the game to this file.")
+parser.add_argument('--move-time', help="Seconds a player has for a single move.", type=float)
+parser.add_argument('--turn-time', help="Seconds a player has for the whole turn.", type=float)
+parser.add_argument('--boards', help="Board library to load boards from, or to write "
+                    "boards to with --generate-boards.")
+parser.add_argument('--board', help="Id of the board of the library to play on.", type=int)
+parser.add_argument('--starts', help="Start pool to start games from, or to write "
+                    "balanced starts to with --generate-starts.")
+parser.add_argument('--generate-starts', help="Generate a pool of this many balanced starts "
+                    "of -n players to the file given by --starts.", type=int)
+parser.add_argument('--balance', help="Largest imbalance of players' largest regions, dice and "
+                    "frontiers of a generated start.", type=float, default=0.25)
+parser.add_argument('--preset', help="Board size, number of areas and players.",
+                    choices=sorted(PRESETS), default='default')
+parser.add_argument('--generate-boards', help="Generate a library of this many boards "
+                    "to the file given by --boards.", type=int)
+parser.add_argument('--replay', help="Replay a recorded game and print its result.")
+parser.add_argument('--games', help="Play a tournament of this many AI-only games "
+                    "(players are given by --ai).", type=int)
+parser.add_argument('--jobs', help="Number of processes playing the tournament or "
+                    "generating starts, defaults to number of CPUs.", type=int)
+parser.add_argument('-o', '--output', help="File with tournament results "
+                    "(CSV if it ends with .csv, JSON lines otherwise).")
+parser.add_argument('--max-turns', help="Maximum number of turns of a tournament game.",
+                    type=int, default=1000)
 
 procs = []
 
@@ -19,6 +53,12 @@ procs = []
 def signal_handler(signum, frame):
     """Handler for SIGCHLD signal that terminates server and clients
     """
+    kill_processes()
+
+
+def kill_processes():
+    """Terminate server and clients
+    """
     for p in procs:
         try:
             p.kill()
@@ -26,6 +66,95 @@ def signal_handler(signum, frame):
             pass
 
 
+def spawn(cmd):
+    """Start a server or client process and wait until it is ready
+
+    The process gets the write end of a pipe by --ready-fd and writes
+    to it once it is ready, or the pipe is closed when the process exits.
+
+    Parameters
+    ----------
+    cmd : list of str
+
+    Returns
+    -------
+    bool
+        True if the process is ready
+    """
+    read_fd, write_fd = os.pipe()
+    procs.append(Popen(cmd + ["--ready-fd", str(write_fd)], pass_fds=[write_fd]))
+    os.close(write_fd)
+    with os.fdopen(read_fd, 'rb') as f:
+        return f.read() == b'ready\n'
+
+
+def run_tournament(args):
+    """Run a tournament of headless AI-only games
+    """
+    from tournament import Tournament
+    from ai import get_ai
+
+    if not args.ai or len(args.ai) < 2:
+        print("Tournament needs at least 2 AI versions.")
+        exit(1)
+    for version in args.ai:
+        if not get_ai(version):
+            print("No AI version {0}.".format(version))
+            exit(1)
+
+    try:
+        tournament = Tournament(args.ai, args.games, jobs=args.jobs, output=args.output,
+                                max_turns=args.max_turns, seed=args.seed,
+                                move_time=args.move_time, turn_time=args.turn_time,
+                                boards=args.boards, generator=get_generator(args),
+                                starts=args.starts)
+    except (OSError, ValueError) as e:
+        print("Cannot run the tournament: {0}.".format(e))
+        exit(1)
+    tournament.run()
+    tournament.print_summary()
+
+
+def get_generator(args):
+    """Get keyword arguments of the board generator given by the preset
+    """
+    return {k: v for k, v in PRESETS[args.preset].items() if k != 'players'}
+
+
+def run_replay(args):
+    """Replay a recorded game
+    """
+    from server.game.headless import replay
+
+    print(replay(args.replay))
+
+
+def run_generate_boards(args):
+    """Generate a board library
+    """
+    from server.game.library import generate_library
+
+    if not args.boards:
+        print("Board library file has to be given by --boards.")
+        exit(1)
+    generate_library(args.boards, args.generate_boards, seed=args.seed,
+                     generator=get_generator(args))
+
+
+def run_generate_starts(args):
+    """Generate a pool of balanced starts
+    """
+    from server.game.balance import generate_starts
+
+    if not args.starts:
+        print("Start pool file has to be given by --starts.")
+        exit(1)
+    dealt = generate_starts(args.starts, args.generate_starts, args.number_of_players,
+                            seed=args.seed, generator=get_generator(args),
+                            tolerance=args.balance, jobs=args.jobs)
+    print("Accepted {0} of {1} starts.".format(args.generate_starts, dealt))
+
+
 def main():
     """
     Run the Dice Wars game.
@@ -33,8 +162,27 @@ def main():
     Example:
         ./dicewars.py -n 4 --ai 4 2 1 
         # runs a four-player game with AIs 4, 2, and 1
+        ./dicewars.py --games 10000 --jobs 16 --ai 7 5 4 2 -o results.csv
+        # runs a tournament of 10000 games between AIs 7, 5, 4, and 2
+        ./dicewars.py --preset stress --ai 5 4 2 1 5 4 2
+        # runs an eight-player game on a large board
     """
     args = parser.parse_args()
+    if args.number_of_players is None:
+        args.number_of_players = PRESETS[args.preset]['players']
+    if args.replay:
+        run_replay(args)
+        return
+    if args.generate_boards:
+        run_generate_boards(args)
+        return
+    if args.generate_starts:
+        run_generate_starts(args)
+        return
+    if args.games:
+        run_tournament(args)
+        return
+
     ai_versions = [1] * (args.number_of_players - 1)
 
     signal(SIGCHLD, signal_handler)
@@ -52,9 +200,29 @@ def main():
             "-n", str(args.number_of_players),
             "-p", str(args.port),
             "-a", str(args.address),
+            "--preset", args.preset,
         ]
+        if args.delta:
+            cmd.append("--delta")
+        if args.seed is not None:
+            cmd.extend(["--seed", str(args.seed)])
+        if args.record:
+            cmd.extend(["--record", args.record])
+        if args.move_time:
+            cmd.extend(["--move-time", str(args.move_time)])
+        if args.turn_time:
+            cmd.extend(["--turn-time", str(args.turn_time)])
+        if args.boards:
+            cmd.extend(["--boards", args.boards])
+        if args.board is not None:
+            cmd.extend(["--board", str(args.board)])
+        if args.starts:
+            cmd.extend(["--starts", args.starts])
 
-        procs.append(Popen(cmd))
+        if not spawn(cmd):
+            print("Server failed to start.")
+            kill_processes()
+            exit(1)
 
         for i in range(1, args.number_of_players + 1):
             if i == 1:
@@ -70,16 +238,23 @@ def main():
                     "-a", str(args.address),
                     "--ai", str(ai_versions[i - 2]),
                 ]
+            cmd.extend(["--encoding", args.encoding])
+            # generated boards are never played again
+            if not args.boards and not args.starts:
+                cmd.append("--no-board-cache")
 
-            procs.append(Popen(cmd))
-            sleep(0.1)
+            # the next client is started once this one is connected, so that
+            # clients are assigned to players in order
+            if not spawn(cmd):
+                print("Client {0} failed to connect.".format(i))
+                kill_processes()
+                exit(1)
 
         for p in procs:
             p.wait()
 
     except KeyboardInterrupt:
-        for p in procs:
-            p.kill()
+        kill_processes()
 
 
 if __name__ == '__main__':
@@ -1,10 +1,43 @@
 from argparse import ArgumentParser
 
+from game.generator import PRESETS
+
 parser = ArgumentParser(prog='Dice_Wars-server')
-parser.add_argument('-n', '--number-of-players', help="Number of players", type=int, default=2)
+parser.add_argument('-n', '--number-of-players', help="Number of players, 2 by default "
+                    "or given by the preset", type=int)
 parser.add_argument('-p', '--port', help="Server port", type=int, default=5005)
 parser.add_argument('-a', '--address', help="Server address", default='127.0.0.1')
 parser.add_argument('-d', '--debug', help="Enable debug output", default='WARN')
+parser.add_argument('--delta', help="Send only changes of the game state to clients",
+                    action='store_true')
+parser.add_argument('--seed', help="Seed of the random number generator", type=int)
+parser.add_argument('--record', help="Write record of the game to this file")
+parser.add_argument('--move-time', help="Seconds a player has for a single move, "
+                    "its turn is ended when it runs out", type=float)
+parser.add_argument('--turn-time', help="Seconds a player has for the whole turn, "
+                    "its turn is ended when it runs out", type=float)
+parser.add_argument('--stats', help="Measure phases of the game loop and dump the statistics "
+                    "as JSON to this file (stderr if no file is given) at the end and on SIGUSR1",
+                    nargs='?', const='-')
+parser.add_argument('--boards', help="Load boards from this board library instead of "
+                    "generating them")
+parser.add_argument('--board', help="Id of the board of the library to play on, "
+                    "a random board if not given", type=int)
+parser.add_argument('--starts', help="Start games from balanced starts of this start pool "
+                    "instead of dealing areas and dice at random")
+parser.add_argument('--ready-fd', help="File descriptor 'ready' is written to once the server "
+                    "accepts clients", type=int)
+parser.add_argument('--preset', help="Board size, number of areas and players",
+                    choices=sorted(PRESETS), default='default')
+parser.add_argument('--board-size', help="Number of hexes in a row and number of rows "
+                    "of generated boards", type=int, nargs=2, metavar=('WIDTH', 'HEIGHT'))
+parser.add_argument('--areas', help="Minimum and maximum number of areas of generated boards",
+                    type=int, nargs=2, metavar=('MIN', 'MAX'))
+parser.add_argument('--area-size', help="Minimum and maximum size of areas of generated boards",
+                    type=int, nargs=2, metavar=('MIN', 'MAX'))
+parser.add_argument('--lobby', help="Host many concurrent games, clients are grouped "
+                    "into games in order of connection", action='store_true')
+parser.add_argument('--games', help="Number of games to host in lobby mode", type=int)
 
 
 def parse():
@@ -12,6 +45,14 @@ def parse():
     Parse command-line arguments.
     """
     args = parser.parse_args()
+    preset = PRESETS[args.preset]
+    if args.number_of_players is None:
+        args.number_of_players = preset['players']
+    args.generator = {
+        'size': tuple(args.board_size or preset['size']),
+        'areas': tuple(args.areas or preset['areas']),
+        'area_size': tuple(args.area_size or preset['area_size']),
+    }
     if args.debug.lower() == 'debug':
         logging = 10
     elif args.debug.lower() == 'info':
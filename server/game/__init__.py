@@ -1,19 +1,29 @@
-import json
-from json.decoder import JSONDecodeError
+import base64
 import logging
 import os
 import random
 import socket
+import time
 
-from game.board import Board
-from game.generator import BoardGenerator
-from game.player import Player
+from common.codec import (DECODE_ERRORS, PROTOCOL_VERSION, choose_encoding, extend_message,
+                          get_codec, json_decode, json_encode)
+from common.framing import HEADER, FrameBuffer, encode_frame
+from common.geometry import encode_board, hash_data
+
+from .board import Board
+from .dice import DiceRoller
+from .generator import BoardGenerator
+from .latency import LatencyHistogram
+from .player import Player
+from .record import GameRecorder
 
 
 class Game(object):
     """Instance of the game
     """
-    def __init__(self, players, addr, port):
+    def __init__(self, players, addr, port, delta=False, rng=None, seed=None, record=None,
+                 move_time=None, turn_time=None, stats=None, board=None, generator=None,
+                 start=None, ready=None):
         """Initialize game and connect clients
 
         Parameters
@@ -24,6 +34,30 @@ class Game(object):
             IP address of the server
         port : int
             Port number
+        delta : bool
+            Send only changes of the game state in battle and end_turn messages
+        rng : random.Random
+            Random number generator used by the game, a new one if None
+        seed : int
+            Seed of the random number generator if rng is None, random if None
+        record : str
+            Path to a file the game record is written to
+        move_time : float
+            Seconds a player has for a single move, unlimited if None
+        turn_time : float
+            Seconds a player has for the whole turn, unlimited if None
+        stats : Stats
+            Statistics the game loop is measured into, dumped at the end
+            of the game; not measured if None
+        board : dict
+            Board to play on instead of a generated one
+        generator : dict
+            Keyword arguments of BoardGenerator, see generator.PRESETS
+        start : dict
+            Board, order of the players, and owners and dice of the areas
+            to start from instead of a random start, see assign_start
+        ready : function
+            Called once the server accepts connections of clients
 
         Attributes
         ----------
@@ -38,19 +72,22 @@ class Game(object):
         self.address = addr
         self.port = port
         self.number_of_players = players
+        self.delta = delta
+        self.init_random(rng, seed)
+        self.recorder = GameRecorder(record) if record else None
+        self.init_timing(move_time, turn_time)
 
         self.create_socket()
-        self.initialize_game()
-        self.connect_clients()
-
+        self.initialize_game(board, generator, start)
+        self.init_stats(stats)
+        self.connect_clients(ready)
 
     def run(self):
         """Main loop of the game
         """
         try:
-            for i in range(1, self.number_of_players + 1):
-                player = self.players[i]
-                self.send_message(player, 'game_state')
+            self.broadcast('game_start')
+            self.broadcast('game_state')
             while True:
                 self.logger.debug("Current player {}".format(self.current_player.get_name()))
                 self.handle_player_turn()
@@ -59,14 +96,18 @@ class Game(object):
 
         except KeyboardInterrupt:
             self.logger.info("Game interrupted.")
-            for i in range(1, self.number_of_players + 1):
-                player = self.players[i]
-                self.send_message(player, 'close_socket')
-        except (BrokenPipeError, JSONDecodeError) as e:
+            self.broadcast('close_socket')
+        except (BrokenPipeError,) + DECODE_ERRORS as e:
             self.logger.error("Connection to client failed: {0}".format(e))
         except ConnectionResetError:
             self.logger.error("ConnectionResetError")
 
+        if self.recorder:
+            self.recorder.close()
+        self.logger.info("Response times: {0}".format(self.get_latency()))
+        if self.stats:
+            self.stats.dump()
+
         try:
             self.close_connections()
         except BrokenPipeError:
@@ -93,20 +134,61 @@ class Game(object):
         """
         self.logger.debug("Handling player {} turn".format(self.current_player.get_name()))
         player = self.current_player.get_name()
-        msg = self.get_message(player)
+        timeout = self.start_move(player)
+        start = time.monotonic()
+        msg = self.get_message(player, timeout)
+        msg = self.check_move(player, msg, time.monotonic() - start)
+        self.handle_message(player, msg)
+
+    def handle_message(self, player, msg):
+        """Carry out the action requested by the current player
+
+        Parameters
+        ----------
+        player : int
+            Name of the player
+        msg : dict
+            Message from the player's client
+        """
+        if self.recorder:
+            self.recorder.add_move(msg)
 
         if msg['type'] == 'battle':
-            atk_dice = self.board.get_area_by_name(msg['atk']).get_dice()
-            def_name = self.board.get_area_by_name(msg['def']).get_owner_name()
-            battle = self.battle(self.board.get_area_by_name(msg['atk']), self.board.get_area_by_name(msg['def']))
+            attacker = self.board.get_area_by_name(msg['atk'])
+            defender = self.board.get_area_by_name(msg['def'])
+            battle = self.battle(attacker, defender)
             self.logger.debug("Battle result: {}".format(battle))
-            for p in self.players:
-                self.send_message(self.players[p], 'battle', battle=battle)
+            self.update_sequence()
+            self.broadcast('battle', battle=battle)
 
         elif msg['type'] == 'end_turn':
             affected_areas = self.end_turn()
-            for p in self.players:
-                self.send_message(self.players[p], 'end_turn', areas=affected_areas)
+            self.update_sequence()
+            self.broadcast('end_turn', areas=affected_areas)
+
+        elif msg['type'] == 'resync':
+            self.send_message(self.players[player], 'game_state')
+
+    def update_sequence(self):
+        """Advance sequence number of the game state and find scores
+        changed since the previous state
+
+        Attributes
+        ----------
+        seq : int
+            Sequence number of the game state
+        scores : dict of int: int
+            Score of each player
+        changed_scores : dict of int: int
+            Scores changed by the last update
+        """
+        self.seq += 1
+        self.changed_scores = {}
+        for p in self.players:
+            score = self.players[p].get_largest_region()
+            if self.scores[p] != score:
+                self.scores[p] = score
+                self.changed_scores[p] = score
 
     def get_state(self):
         """Get game state
@@ -121,22 +203,48 @@ class Game(object):
             'areas': {}
         }
 
+        owners = self.board.owners
+        dice = self.board.dice
         for a in self.board.areas:
-            area = self.board.areas[a]
-            game_state['areas'][area.name] = {
-                'adjacent_areas': area.get_adjacent_areas_names(),
-                'owner': area.get_owner_name(),
-                'dice': area.get_dice()
+            game_state['areas'][a] = {
+                'adjacent_areas': self.board.areas[a].get_adjacent_areas_names(),
+                'owner': owners[a] or False,
+                'dice': dice[a]
             }
 
         game_state['score'] = {}
 
         for p in self.players:
             player = self.players[p]
-            game_state['score'][player.get_name()] = player.get_largest_region(self.board)
+            game_state['score'][player.get_name()] = player.get_largest_region()
 
         return game_state
 
+    def is_valid_battle(self, player, msg):
+        """Check that the player can carry out the battle
+
+        Parameters
+        ----------
+        player : int
+            Name of the player
+        msg : dict
+            Battle message from the player's client
+
+        Returns
+        -------
+        bool
+            True if the player's area with more than one die attacks
+            an adjacent area of another player
+        """
+        attacker = self.board.get_area_by_name(msg.get('atk'))
+        defender = self.board.get_area_by_name(msg.get('def'))
+        if attacker is None or defender is None:
+            return False
+        return (attacker.get_owner_name() == player
+                and defender.get_owner_name() != player
+                and attacker.get_dice() > 1
+                and defender.get_name() in attacker.get_adjacent_areas_names())
+
     def battle(self, attacker, defender):
         """Carry out a battle
 
@@ -149,15 +257,11 @@ class Game(object):
         """
         atk_dice = attacker.get_dice()
         def_dice = defender.get_dice()
-        atk_pwr = def_pwr = 0
-
         atk_name = attacker.get_owner_name()
         def_name = defender.get_owner_name()
 
-        for i in range(0, atk_dice):
-            atk_pwr += random.randint(1,6)
-        for i in range(0, def_dice):
-            def_pwr += random.randint(1,6)
+        atk_pwr = self.dice_roller.roll(atk_dice)
+        def_pwr = self.dice_roller.roll(def_dice)
 
         battle = {
             'atk': {
@@ -168,14 +272,13 @@ class Game(object):
             }
         }
 
-        attacker.set_dice(1)
+        self.set_area_dice(attacker, 1)
 
         if atk_pwr > def_pwr:
-            defender.set_owner_name(atk_name)
-            self.players[atk_name].add_area(defender)
             self.players[def_name].remove_area(defender)
-            attacker.set_dice(1)
+            defender.set_owner_name(atk_name)
             defender.set_dice(atk_dice - 1)
+            self.players[atk_name].add_area(defender)
             battle['def'] = {
                 'name': defender.get_name(),
                 'dice': atk_dice - 1,
@@ -201,25 +304,12 @@ class Game(object):
         dict
             Dictionary of affected areas including number of dice in these areas
         """
-        affected_areas = []
         player = self.current_player
-        dice = player.get_reserve() + player.get_largest_region(self.board)
+        dice = player.get_reserve() + player.get_largest_region()
         if dice > 64:
             dice = 64
 
-        areas = []
-        for area in self.current_player.get_areas():
-            areas.append(area)
-
-        while dice and areas:
-            area = random.choice(areas)
-            if not area.add_die():
-                areas.remove(area)
-            else:
-                if area not in affected_areas:
-                    affected_areas.append(area)
-                dice -= 1
-
+        dice, affected_areas = self.distribute_dice(player.get_areas(), dice)
         player.set_reserve(dice)
 
         self.set_next_player()
@@ -233,6 +323,53 @@ class Game(object):
 
         return list_of_areas
 
+    def distribute_dice(self, areas, dice):
+        """Add dice to randomly chosen areas that are not full
+
+        Parameters
+        ----------
+        areas : list of Area
+        dice : int
+            Number of dice to distribute
+
+        Returns
+        -------
+        int, list of Area
+            Number of dice that did not fit into the areas and
+            areas that got at least one die
+        """
+        areas = [area for area in areas if area.get_dice() < 8]
+        affected_areas = {}
+
+        while dice > 0 and areas:
+            i = self.rng.randrange(len(areas))
+            area = areas[i]
+            area.add_die()
+            self.players[area.get_owner_name()].add_dice(1)
+            affected_areas[area.get_name()] = area
+            dice -= 1
+            if area.get_dice() >= 8:
+                # remove full area by moving the last area in its place
+                areas[i] = areas[-1]
+                areas.pop()
+
+        return dice, list(affected_areas.values())
+
+    def set_area_dice(self, area, dice):
+        """Set number of dice in an area and update its owner's dice
+
+        The owner's dice change only by what the area accepts, see
+        Area.set_dice.
+
+        Parameters
+        ----------
+        area : Area
+        dice : int
+        """
+        old = area.get_dice()
+        area.set_dice(dice)
+        self.players[area.get_owner_name()].add_dice(area.get_dice() - old)
+
     def set_first_player(self):
         """Set first player
         """
@@ -244,58 +381,199 @@ class Game(object):
 
     def set_next_player(self):
         """Set next player in order as a current player
+
+        Raises
+        ------
+        RuntimeError
+            If all players are eliminated
         """
         current_player_name = self.current_player.get_name()
         current_idx = self.players_order.index(current_player_name)
-        idx = self.players_order[(current_idx + 1) % self.number_of_players]
-        while True:
-            try:
-                if self.players[idx].get_largest_region(self.board) == 0:
-                    current_idx = (current_idx + 1) % self.number_of_players
-                    idx = self.players_order[(current_idx + 1) % self.number_of_players]
-                    continue
+        for i in range(1, self.number_of_players + 1):
+            idx = self.players_order[(current_idx + i) % self.number_of_players]
+            # skip eliminated players
+            if self.players[idx].get_number_of_areas():
                 self.current_player = self.players[idx]
                 self.logger.debug("Current player: {}".format(self.current_player.get_name()))
-            except IndexError:
-                exit(1)
-            return
+                return
+        raise RuntimeError("No player left to play")
 
     def check_win_condition(self):
         """Check win conditions
 
+        Only the current player can conquer the last area of the board.
+
         Returns
         -------
         bool
             True if a player has won, False otherwise
         """
-        for p in self.players:
-            player = self.players[p]
-            if player.get_number_of_areas() == self.board.get_number_of_areas():
-                self.logger.info("Player {} wins!".format(player.get_name()))
-                for i in self.players:
-                    self.send_message(self.players[i], 'game_end', winner=player.get_name())
-                return True
+        player = self.current_player
+        if player.get_number_of_areas() == self.board.get_number_of_areas():
+            self.logger.info("Player {} wins!".format(player.get_name()))
+            self.broadcast('game_end', winner=player.get_name())
+            return True
 
         return False
 
+    ##########
+    # TIMING #
+    ##########
+    def init_timing(self, move_time=None, turn_time=None):
+        """Set time limits of players' moves
+
+        Parameters
+        ----------
+        move_time : float
+            Seconds a player has for a single move, unlimited if None
+        turn_time : float
+            Seconds a player has for the whole turn, unlimited if None
+
+        Attributes
+        ----------
+        latency : dict of int: LatencyHistogram
+            Response times of the players
+        turn_player : int
+            Name of the player whose turn has started at turn_start
+        """
+        self.move_time = move_time
+        self.turn_time = turn_time
+        self.latency = {}
+        self.turn_player = None
+        self.turn_start = None
+
+    def is_timed(self):
+        """Check whether players' moves are time limited
+        """
+        return bool(self.move_time or self.turn_time)
+
+    def start_move(self, player):
+        """Start waiting for the player's move
+
+        Messages the player sent late in its previous turn are discarded
+        when its new turn starts.
+
+        Parameters
+        ----------
+        player : int
+            Name of the current player
+
+        Returns
+        -------
+        float
+            Seconds the player has for the move, None if unlimited
+        """
+        now = time.monotonic()
+        if player != self.turn_player:
+            self.turn_player = player
+            self.turn_start = now
+            if self.is_timed():
+                self.discard_messages(player)
+
+        timeouts = []
+        if self.move_time:
+            timeouts.append(self.move_time)
+        if self.turn_time:
+            timeouts.append(self.turn_start + self.turn_time - now)
+        if not timeouts:
+            return None
+        return max(0.0, min(timeouts))
+
+    def check_move(self, player, msg, seconds):
+        """Record response time of the player and end its turn if it
+        did not make a valid move in time
+
+        A late move may still arrive at the beginning of the player's
+        next turn, so battles are checked against the current board.
+
+        Parameters
+        ----------
+        player : int
+            Name of the current player
+        msg : dict
+            Message from the player, None if it did not come in time
+        seconds : float
+            Time the player took to respond
+
+        Returns
+        -------
+        dict
+            Message to be handled
+        """
+        if player not in self.latency:
+            self.latency[player] = LatencyHistogram()
+        self.latency[player].add(seconds, timeout=msg is None)
+
+        if msg is None:
+            self.logger.warning("Player {0} ran out of time after {1:.3f} s".format(player, seconds))
+            msg = {'type': 'end_turn'}
+        elif msg['type'] == 'battle' and not self.is_valid_battle(player, msg):
+            self.logger.warning("Invalid battle of player {0}: {1}".format(player, msg))
+            msg = {'type': 'end_turn'}
+        return msg
+
+    def get_latency(self):
+        """Get summary of players' response times
+
+        Returns
+        -------
+        dict of int: dict
+            Summary of response times of each player, see LatencyHistogram.to_dict
+        """
+        return {p: self.latency[p].to_dict() for p in sorted(self.latency)}
+
+    def init_stats(self, stats=None):
+        """Measure phases of the game loop
+
+        Parameters
+        ----------
+        stats : Stats
+            Statistics the phases are measured into, not measured if None
+        """
+        self.stats = stats
+        if not stats:
+            return
+
+        stats.instrument(self, [
+            'handle_player_turn', 'get_message', 'check_move', 'handle_message',
+            'battle', 'end_turn', 'update_sequence', 'set_next_player',
+            'check_win_condition', 'send_message', 'broadcast', 'send_data',
+            'create_message', 'get_state',
+        ], prefix='Game')
+        for player in self.players.values():
+            stats.instrument(player, [
+                'add_area', 'remove_area', 'get_largest_region', 'send_message',
+            ])
+        if self.board_counters:
+            for name, value in self.board_counters.items():
+                stats.count('board_' + name, value)
+
     ##############
     # NETWORKING #
     ##############
-    def get_message(self, player):
+    def get_message(self, player, timeout=None):
         """Read message from client
 
         Parameters
         ----------
         player : int
             Name of the client
+        timeout : float
+            Seconds to wait for the message, unlimited if None
 
         Returns
         -------
-        str
-            Decoded message from the client
+        dict
+            Decoded message from the client, None if it did not come in time
         """
-        raw_message = self.client_sockets[player].recv(self.buffer)
-        msg = json.loads(raw_message.decode())
+        sock = self.client_sockets[player]
+        try:
+            raw_message = self.receive_frame(sock, self.frame_buffers[player], timeout)
+        except socket.timeout:
+            return None
+        finally:
+            sock.settimeout(None)
+        msg = self.codecs[player][1](raw_message)
         self.logger.debug("Got message from client {}; type: {}".format(player, msg['type']))
         return msg
 
@@ -316,30 +594,175 @@ class Game(object):
             Areas changed during the turn
         """
         self.logger.debug("Sending msg type '{}' to client {}".format(type, client.get_name()))
+        msg = self.create_message(client, type, battle=battle, winner=winner, areas=areas)
+        encode = self.get_codec(client.get_name())[0]
+        self.send_data(client, encode_frame(encode(msg)))
+
+    def broadcast(self, type, battle=None, winner=None, areas=None):
+        """Send message to all clients
+
+        The message is created and encoded only once for each encoding
+        used by the clients, fields specific to a client are added to
+        the encoded message.
+
+        Parameters
+        ----------
+        type : str
+            Type of message
+        battle : dict
+            Result of a battle
+        winner : int
+            Winner of the game
+        areas : list of int
+            Areas changed during the turn
+        """
+        self.logger.debug("Broadcasting msg type '{}'".format(type))
+        msg = self.create_message(None, type, battle=battle, winner=winner, areas=areas)
+        frames = {}
+        for p in self.players:
+            client = self.players[p]
+            codec = self.get_codec(p)
+            if codec not in frames:
+                frames[codec] = encode_frame(codec[0](msg))
+
+            fields = self.get_recipient_fields(client, type)
+            if fields:
+                data = extend_message(codec, frames[codec][HEADER.size:], fields)
+                self.send_data(client, encode_frame(data))
+            else:
+                self.send_data(client, frames[codec])
+
+    def get_codec(self, player):
+        """Get codec of messages agreed with the client, see codec.get_codec
+        """
+        return self.codecs[player]
+
+    def send_data(self, client, data):
+        """Send encoded message to a client
+
+        Parameters
+        ----------
+        client : Player
+            Recepient of the message
+        data : bytes
+            Frame of the encoded message
+        """
+        client.send_message(data)
+
+    def receive_frame(self, sock, frames, timeout=None):
+        """Receive a single frame from a socket
+
+        Parameters
+        ----------
+        sock : socket
+        frames : FrameBuffer
+            Buffer of data received from the socket
+        timeout : float
+            Seconds to wait for the whole frame, unlimited if None;
+            socket.timeout is raised when it runs out
+
+        Returns
+        -------
+        bytes
+            Payload of the frame
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        raw_message = frames.get_frame()
+        while raw_message is None:
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise socket.timeout("timed out")
+                sock.settimeout(remaining)
+            data = sock.recv(self.buffer)
+            if not data:
+                raise ConnectionResetError("Client disconnected")
+            frames.feed(data)
+            raw_message = frames.get_frame()
+        return raw_message
+
+    def discard_messages(self, player):
+        """Discard messages the client has sent so far
+
+        Parameters
+        ----------
+        player : int
+            Name of the client
+        """
+        sock = self.client_sockets[player]
+        frames = self.frame_buffers[player]
+        sock.setblocking(False)
+        try:
+            while True:
+                data = sock.recv(self.buffer)
+                if not data:
+                    break
+                frames.feed(data)
+        except BlockingIOError:
+            pass
+        finally:
+            sock.setblocking(True)
+
+        for raw_message in frames.get_frames():
+            self.logger.warning("Discarding late message from client {0}".format(player))
+
+    def create_message(self, client, type, battle=None, winner=None, areas=None):
+        """Create message for a client
+
+        Parameters
+        ----------
+        client : Player
+            Recepient of the message, None for the part of the message
+            shared by all clients
+        type : str
+            Type of message
+        battle : dict
+            Result of a battle
+        winner : int
+            Winner of the game
+        areas : list of int
+            Areas changed during the turn
+
+        Returns
+        -------
+        dict
+            Message to be sent to the client
+        """
         if type == 'game_start':
             msg = self.get_state()
             msg['type'] = 'game_start'
-            msg['player'] = client.get_name()
+            msg['seq'] = self.seq
+            msg['delta'] = self.delta
             msg['no_players'] = self.number_of_players
             msg['current_player'] = self.current_player.get_name()
-            msg['board'] = self.board.get_board()
             msg['order'] = self.players_order
 
         elif type == 'game_state':
             msg = self.get_state()
             msg['type'] = 'game_state'
-            msg['player'] = client.get_name()
+            msg['seq'] = self.seq
             msg['no_players'] = self.number_of_players
             msg['current_player'] = self.current_player.get_name()
+            msg['reserves'] = {
+                i: self.players[i].get_reserve() for i in self.players
+            }
 
         elif type is 'battle':
-            msg = self.get_state()
+            if self.delta:
+                msg = {'score': self.changed_scores}
+            else:
+                msg = self.get_state()
             msg['type'] = 'battle'
+            msg['seq'] = self.seq
             msg['result'] = battle
 
         elif type is 'end_turn':
-            msg = self.get_state()
+            if self.delta:
+                msg = {'score': self.changed_scores}
+            else:
+                msg = self.get_state()
             msg['type'] = 'end_turn'
+            msg['seq'] = self.seq
             msg['areas'] = areas
             msg['current_player'] = self.current_player.get_name()
             msg['reserves'] = {
@@ -355,8 +778,56 @@ class Game(object):
         elif type == 'close_socket':
             msg = {'type': 'close_socket'}
 
-        msg = json.dumps(msg)
-        client.send_message(msg + '\0')
+        if client is not None:
+            msg.update(self.get_recipient_fields(client, type))
+        return msg
+
+    def get_recipient_fields(self, client, type):
+        """Get fields of a message specific to its recipient
+
+        Parameters
+        ----------
+        client : Player
+            Recepient of the message
+        type : str
+            Type of message
+
+        Returns
+        -------
+        dict
+        """
+        if type == 'game_start':
+            return dict(self.get_board_fields(client.get_name()), player=client.get_name())
+        if type == 'game_state':
+            return {'player': client.get_name()}
+        return {}
+
+    def get_board_fields(self, player):
+        """Get board of the game_start message for a client
+
+        Clients that need no geometry get only adjacency of the areas.
+        The board is left out if the client has it cached.
+
+        Parameters
+        ----------
+        player : int
+            Name of the client
+
+        Returns
+        -------
+        dict
+            Fingerprint of the board, and the board encoded by
+            geometry.encode_board in base64 unless the client has it
+        """
+        features = self.client_features.get(player, {})
+        if features.get('geometry', True):
+            board_id, data = self.board_id, self.board_data
+        else:
+            board_id, data = self.topology_id, self.topology_data
+
+        if board_id in features.get('boards', ()):
+            return {'board_id': board_id}
+        return {'board_id': board_id, 'board': data}
 
     def create_socket(self):
         """Initiate server socket
@@ -370,24 +841,95 @@ class Game(object):
             self.logger.error("Cannot create socket. {0}.".format(e))
             exit(1)
 
-    def connect_clients(self):
+    def connect_clients(self, ready=None):
         """Connect all clients
+
+        Parameters
+        ----------
+        ready : function
+            Called once the server listens for clients
         """
         self.client_sockets = {}
+        self.frame_buffers = {}
+        self.codecs = {}
+        self.client_features = {}
 
         self.socket.listen(self.number_of_players)
         self.logger.debug("Waiting for clients to connect")
+        if ready:
+            ready()
 
-        for i in range(1, self.number_of_players + 1):
-            self.connect_client(i)
+        i = 1
+        while i <= self.number_of_players:
+            if self.connect_client(i):
+                i += 1
         self.logger.debug("Successfully assigned clients to all players")
 
     def connect_client(self, i):
         """Assign client to an instance of Player
+
+        Returns
+        -------
+        bool
+            False if the client was rejected during handshake
         """
         sock, client_address = self.socket.accept()
-        player = self.add_client(sock, client_address, i)
-        self.send_message(player, 'game_start')
+        frames = FrameBuffer()
+        try:
+            encoding, features = self.handshake(sock, frames)
+        except (ConnectionError, KeyError, TypeError) + DECODE_ERRORS as e:
+            self.logger.error("Handshake with {0} failed: {1}".format(client_address, e))
+            encoding = None
+        if not encoding:
+            sock.close()
+            return False
+
+        self.add_client(sock, client_address, i)
+        self.frame_buffers[i] = frames
+        self.client_features[i] = features
+        self.codecs[i] = get_codec(encoding)
+        if self.stats:
+            self.codecs[i] = self.stats.wrap_codec(self.codecs[i])
+        return True
+
+    def handshake(self, sock, frames):
+        """Agree with a client on protocol version and encoding of messages
+
+        The client starts with a hello message listing encodings it supports,
+        fingerprints of boards it has cached and whether it needs geometry
+        of the board, the server answers with the chosen encoding. Both
+        hello messages are encoded as JSON.
+
+        Parameters
+        ----------
+        sock : socket
+        frames : FrameBuffer
+
+        Returns
+        -------
+        str, dict
+            Name of the encoding, None if the client is not supported, and
+            features of the client: fingerprints of cached 'boards' and
+            whether it needs 'geometry'
+        """
+        msg = json_decode(self.receive_frame(sock, frames))
+        encoding = None
+        features = {}
+        if msg['type'] == 'hello' and msg['version'] == PROTOCOL_VERSION:
+            encoding = choose_encoding(msg['encodings'])
+            features = {
+                'boards': set(msg.get('boards', [])),
+                'geometry': msg.get('geometry', True),
+            }
+        else:
+            self.logger.error("Unsupported client protocol: {0}".format(msg))
+
+        sock.sendall(encode_frame(json_encode({
+            'type': 'hello',
+            'version': PROTOCOL_VERSION,
+            'encoding': encoding,
+        })))
+        return encoding, features
 
     def add_client(self, connection, client_address, i):
         """Add client's socket to an instance of Player
@@ -440,32 +982,110 @@ class Game(object):
     ##################
     # INITIALIZATION #
     ##################
-    def initialize_game(self):
+    def init_random(self, rng=None, seed=None):
+        """Initialize random number generator of the game
+
+        Parameters
+        ----------
+        rng : random.Random
+            Random number generator, a new one is created if None
+        seed : int
+            Seed of the new generator, random if None
+
+        Attributes
+        ----------
+        rng : random.Random
+        seed : int
+            Seed of the generator, None if rng was given without a seed
+        """
+        if rng is None:
+            if seed is None:
+                seed = random.randrange(1 << 32)
+            rng = random.Random(seed)
+        self.seed = seed
+        self.rng = rng
+
+    def initialize_game(self, board=None, generator=None, start=None):
         """Initialization of the game
 
+        The board is generated by its own random number generator seeded
+        from the game's generator, so that the rest of the game does not
+        depend on how the board was created.
+
+        Parameters
+        ----------
+        board : dict
+            Board to play on instead of a generated one
+        generator : dict
+            Keyword arguments of BoardGenerator, see generator.PRESETS
+        start : dict
+            Start of the game instead of a random one, see assign_start
+
         Attributes
         ----------
         board : Board
+        board_id : str
+            Fingerprint of the board, clients that have the board cached
+            get only the fingerprint in the game_start message
+        board_data : str
+            Board encoded by geometry.encode_board in base64, sent to
+            clients that do not have the board cached
+        topology_id, topology_data : str
+            Fingerprint and encoding of the board without hexes, for
+            clients that need no geometry
+        board_counters : dict of str: int
+            Statistics of the board generation, see
+            BoardGenerator.get_counters; None if the board was given
         players : list of Player
         players_order : list of int
         """
-        generator = BoardGenerator()
-        self.board = Board(generator.generate_board())
+        board_rng = random.Random(self.rng.randrange(1 << 32))
+        self.board_counters = None
+        if start is not None:
+            if len(start['order']) != self.number_of_players:
+                raise ValueError("Start of {0} players used for a game of {1} players".format(
+                    len(start['order']), self.number_of_players))
+            board = start['board']
+        if board is None:
+            generator = BoardGenerator(rng=board_rng, **(generator or {}))
+            board = generator.generate_board()
+            self.board_counters = generator.get_counters()
+            self.logger.debug("Board generated: {0}".format(self.board_counters))
+        self.board = Board(board)
+        data = encode_board(board)
+        self.board_id = hash_data(data)
+        self.board_data = base64.b64encode(data).decode()
+        data = encode_board({name: {'neighbours': board[name]['neighbours']} for name in board})
+        self.topology_id = hash_data(data)
+        self.topology_data = base64.b64encode(data).decode()
+        if self.recorder:
+            self.recorder.start(self.seed, self.number_of_players, board, start)
+        self.dice_roller = DiceRoller(self.rng)
 
         self.players = {}
         for i in range(1, self.number_of_players + 1):
             self.players[i] = Player(i)
 
-        self.players_order = list(range(1, self.number_of_players + 1))
-        random.shuffle(self.players_order)
+        if start is None:
+            self.players_order = list(range(1, self.number_of_players + 1))
+            self.rng.shuffle(self.players_order)
+        else:
+            self.players_order = list(start['order'])
 
         self.set_first_player()
         self.logger.debug("Player order {0}".format(self.players_order))
 
-        self.assign_areas_to_players()
-        self.assign_dice_to_players()
+        if start is None:
+            self.assign_areas_to_players()
+            self.assign_dice_to_players()
+        else:
+            self.assign_start(start)
         self.logger.debug("Board initialized")
 
+        self.seq = 0
+        self.scores = {p: self.players[p].get_largest_region() for p in self.players}
+        self.changed_scores = {}
+
     def assign_areas_to_players(self):
         """Assigns areas to players at the start of the game
         """
@@ -475,7 +1095,7 @@ class Game(object):
 
         while True:
             for player in reversed(self.players_order):
-                area_name = random.choice(areas)
+                area_name = self.rng.choice(areas)
                 area = self.board.get_area_by_name(area_name)
                 self.assign_area(area, self.players[player])
                 areas.remove(area_name)
@@ -483,10 +1103,24 @@ class Game(object):
                 if not areas:
                     return
 
+    def assign_start(self, start):
+        """Assigns areas and dice to players as given by the start
+
+        Parameters
+        ----------
+        start : dict
+            'order' of the players, and owner and number of dice of each
+            area in 'areas' as a dict of int: [int, int]
+        """
+        for name, (owner, dice) in sorted(start['areas'].items()):
+            area = self.board.get_area_by_name(name)
+            self.assign_area(area, self.players[owner])
+            self.set_area_dice(area, dice)
+
     def assign_dice_to_players(self):
         """Assigns dice to players at the start of the game
         """
-        dice_total = 3 * self.board.get_number_of_areas() - random.randint(0, 5)
+        dice_total = 3 * self.board.get_number_of_areas() - self.rng.randint(0, 5)
         players = len(self.players)
         players_processed = 0
 
@@ -494,21 +1128,13 @@ class Game(object):
             dice = int(round(dice_total/ (players - players_processed)))
             dice_total -= dice
 
-            areas = []
-            for area in self.players[player].get_areas():
-                areas.append(area)
+            areas = self.players[player].get_areas()
 
             # each area has to have at least one die
             for area in areas:
-                area.set_dice(1)
+                self.set_area_dice(area, 1)
                 dice -= 1
 
-            while dice and areas:
-                area = random.choice(areas)
-                if not area.add_die(): # adding a die to area failed means that area is full
-                    areas.remove(area)
-                else:
-                    dice -= 1
-
+            self.distribute_dice(areas, dice)
             players_processed += 1
 
@@ -1,17 +1,17 @@
-import logging
-
-
 class Area(object):
     """Object representing a single area.
+
+    The area is a view of the board, its owner and dice are stored
+    in the board's arrays.
     """
-    def __init__(self, name, adjacent_areas):
+    def __init__(self, name, board):
         """ 
         Parameters
         ----------
         name : int
             Identifier of the area
-        adjacent_areas : list of int
-            Names of adjacent areas
+        board : Board
+            Board the area belongs to
 
         Attributes
         ----------
@@ -19,18 +19,13 @@ class Area(object):
             Adjacent areas
         adjacent_areas_names : list of int
             Names of adjacent areas
-        dice : int
-            Number of dice in the area
-        owner_name : int
-            Name of the player controlling the area
         """
         self.name = name
-        self.adjacent_areas_names = adjacent_areas
-        self.logger = logging.getLogger('SERVER')
+        self.board = board
+        self.logger = board.logger
 
+        self.adjacent_areas_names = board.get_adjacent_areas_names(name)
         self.adjacent_areas = []
-        self.dice = 0
-        self.owner_name = None
 
     def add_adjacent_areas(self, board):
         """Add instances of adjacent areas to the list
@@ -51,11 +46,12 @@ class Area(object):
         bool
             False if area already contains 8 dice, otherwise True
         """
-        if self.dice >= 8:
-            self.dice = 8
+        dice = self.board.dice
+        if dice[self.name] >= 8:
+            dice[self.name] = 8
             return False
         else:
-            self.dice += 1
+            dice[self.name] += 1
             return True
 
     def get_adjacent_areas(self):
@@ -86,7 +82,7 @@ class Area(object):
         int
             Number of dice
         """
-        return self.dice
+        return self.board.dice[self.name]
 
     def get_name(self):
         """Get area's name
@@ -106,10 +102,11 @@ class Area(object):
         int or bool
             Returns owner's name if area has an owner, otherwise False
         """
-        if not self.owner_name:
+        owner = self.board.owners[self.name]
+        if not owner:
             return False
         else:
-            return self.owner_name
+            return owner
 
     def set_dice(self, dice):
         """Set area's dice to a certain value
@@ -123,7 +120,7 @@ class Area(object):
             self.logger.warning("Trying to assign {0} dice to area {1}"\
                                 .format(dice, self.name))
         else:
-            self.dice = dice
+            self.board.dice[self.name] = dice
 
     def set_owner_name(self, name):
         """Set owner's name
@@ -133,4 +130,4 @@ class Area(object):
         name : int
             Name of the owner
         """
-        self.owner_name = name
+        self.board.owners[self.name] = name
@@ -0,0 +1,250 @@
+import json
+import logging
+from multiprocessing import Pool
+import os
+import random
+
+from . import Game
+
+
+VERSION = 1
+
+
+class StartDealer(Game):
+    """Game that only generates a board and deals areas and dice to players
+
+    Players' names are seats, the start is scored in the order the seats
+    are playing.
+    """
+    def __init__(self, players, seed, generator=None):
+        """
+        Parameters
+        ----------
+        players : int
+            Number of players
+        seed : int
+            Seed of the start
+        generator : dict
+            Keyword arguments of BoardGenerator, see generator.PRESETS
+        """
+        self.logger = logging.getLogger('SERVER')
+
+        self.number_of_players = players
+        self.recorder = None
+        self.init_random(None, seed)
+        self.initialize_game(None, generator)
+
+    def get_score(self):
+        """Get balance features of the players in the order they are playing
+
+        Returns
+        -------
+        dict of str: list of int
+            Size of the largest region, number of dice and number of
+            areas adjacent to an opponent's area of each player
+        """
+        regions = []
+        dice = []
+        frontier = []
+        for p in self.players_order:
+            player = self.players[p]
+            regions.append(player.get_largest_region())
+            dice.append(player.dice)
+            frontier.append(sum(
+                1 for area in player.get_areas()
+                if any(a.get_owner_name() != p for a in area.get_adjacent_areas())
+            ))
+        return {
+            'regions': regions,
+            'dice': dice,
+            'frontier': frontier,
+        }
+
+    def get_start(self):
+        """Get the dealt start, see Game.assign_start
+
+        Returns
+        -------
+        dict
+        """
+        return {
+            'seed': self.seed,
+            'order': list(self.players_order),
+            'areas': {name: [area.get_owner_name(), area.get_dice()]
+                      for name, area in self.board.areas.items()},
+            'board': self.board.get_board(),
+        }
+
+
+def get_imbalance(score):
+    """Get imbalance of a start
+
+    Imbalance of a feature is the difference between the best and the
+    worst player relative to the mean, but at least one so that starts
+    differing by a single area or die are not rejected on small boards.
+
+    Parameters
+    ----------
+    score : dict of str: list of int
+        Balance features of the players, see StartDealer.get_score
+
+    Returns
+    -------
+    float
+        Largest imbalance of the features
+    """
+    imbalance = 0.0
+    for values in score.values():
+        mean = sum(values) / len(values)
+        spread = max(values) - min(values)
+        if spread > 1:
+            imbalance = max(imbalance, spread / max(mean, 1))
+    return imbalance
+
+
+def deal_start(candidate):
+    """Generate and score a single candidate start
+
+    Parameters
+    ----------
+    candidate : (int, int, dict, float)
+        Number of players, seed of the start, keyword arguments of
+        BoardGenerator, and the largest imbalance of an accepted start
+
+    Returns
+    -------
+    dict
+        The start with its imbalance, None if it was rejected
+    """
+    players, seed, generator, tolerance = candidate
+    dealer = StartDealer(players, seed, generator)
+    imbalance = get_imbalance(dealer.get_score())
+    if imbalance > tolerance:
+        return None
+    start = dealer.get_start()
+    start['imbalance'] = round(imbalance, 4)
+    return start
+
+
+def generate_starts(path, count, players, seed=None, generator=None, tolerance=0.25, jobs=None):
+    """Generate balanced starts in parallel and write them to a start pool file
+
+    Candidates are dealt and scored by worker processes and accepted
+    starts are written as they come, in the order of their seeds, so the
+    same seed gives the same pool regardless of the number of processes.
+
+    Parameters
+    ----------
+    path : str
+    count : int
+        Number of starts
+    players : int
+        Number of players
+    seed : int
+        Seed of the first candidate, candidate i is seeded with seed + i;
+        random if None
+    generator : dict
+        Keyword arguments of BoardGenerator, see generator.PRESETS
+    tolerance : float
+        Largest imbalance of an accepted start, see get_imbalance
+    jobs : int
+        Number of worker processes, number of CPUs if None
+
+    Returns
+    -------
+    int
+        Number of candidates dealt
+    """
+    logger = logging.getLogger('SERVER')
+    if seed is None:
+        seed = random.randrange(1 << 32)
+    jobs = jobs or os.cpu_count()
+    batch = 64 * jobs
+
+    accepted = 0
+    dealt = 0
+    with open(path, 'w') as f, Pool(jobs) as pool:
+        f.write(json.dumps({
+            'version': VERSION,
+            'players': players,
+            'tolerance': tolerance,
+        }) + '\n')
+        while accepted < count:
+            candidates = [(players, seed + dealt + i, generator, tolerance) for i in range(batch)]
+            for start in pool.imap(deal_start, candidates, chunksize=16):
+                dealt += 1
+                if start is None:
+                    continue
+                f.write(json.dumps(start) + '\n')
+                accepted += 1
+                if accepted >= count:
+                    break
+            logger.info("Accepted {0} of {1} starts".format(accepted, dealt))
+    return dealt
+
+
+class StartPool(object):
+    """Pool of balanced starts stored in a file of JSON lines,
+    see generate_starts
+    """
+    def __init__(self, path):
+        """
+        Parameters
+        ----------
+        path : str
+            Path to the start pool file
+
+        Attributes
+        ----------
+        players : int
+            Number of players of the starts
+        starts : list of str
+            Encoded starts, decoded when they are used
+        """
+        with open(path) as f:
+            header = json.loads(f.readline())
+            if header.get('version') != VERSION:
+                raise ValueError("{0} is not a start pool of version {1}".format(path, VERSION))
+            self.players = header['players']
+            self.starts = [line for line in f if line.strip()]
+
+    def __len__(self):
+        return len(self.starts)
+
+    def get_start(self, start_id):
+        """Load a start
+
+        Parameters
+        ----------
+        start_id : int
+            Position of the start in the pool
+
+        Returns
+        -------
+        dict
+            Order of the players, owner and dice of each area, and the
+            board, see Game.assign_start
+        """
+        start = json.loads(self.starts[start_id])
+        start['areas'] = {int(name): area for name, area in start['areas'].items()}
+        start['board'] = {
+            int(name): {
+                'hexes': [tuple(h) for h in area['hexes']],
+                'neighbours': area['neighbours'],
+            }
+            for name, area in start['board'].items()
+        }
+        return start
+
+    def random_start(self, rng):
+        """Load a random start
+
+        Parameters
+        ----------
+        rng : random.Random
+
+        Returns
+        -------
+        dict
+        """
+        return self.get_start(rng.randrange(len(self.starts)))
@@ -1,8 +1,14 @@
-from game.area import Area
+from array import array
+import logging
+
+from .area import Area
 
 
 class Board(object):
     """Object representing the game board
+
+    Owners and dice of the areas are stored in flat arrays indexed by
+    area's name, adjacency is stored in compressed sparse row format.
     """
     def __init__(self, board):
         """
@@ -15,14 +21,49 @@ class Board(object):
         ----------
         areas : dict of int: Area
             Dictionary of Area instances
+        owners : array of int
+            Owner of each area, 0 if the area has no owner
+        dice : array of int
+            Number of dice in each area
+        offsets : array of int
+            Adjacent areas of area i are neighbours[offsets[i]:offsets[i + 1]]
+        neighbours : array of int
+            Names of adjacent areas of all areas
         """
         self.board = board
+        self.logger = logging.getLogger('SERVER')
+
+        size = max(board) + 1 if board else 1
+        self.owners = array('B', bytes(size))
+        self.dice = array('B', bytes(size))
+
+        self.offsets = array('I', [0])
+        self.neighbours = array('I')
+        for name in range(size):
+            if name in board:
+                self.neighbours.extend(board[name]['neighbours'])
+            self.offsets.append(len(self.neighbours))
+
         self.areas = {}
         for area in board:
-            self.areas[area] = Area(area, board[area]['neighbours'])
+            self.areas[area] = Area(area, self)
         for a in self.areas:
             self.areas[a].add_adjacent_areas(self)
 
+    def get_adjacent_areas_names(self, name):
+        """Get names of areas adjacent to an area
+
+        Parameters
+        ----------
+        name : int
+            Area's name
+
+        Returns
+        -------
+        list of int
+        """
+        return self.neighbours[self.offsets[name]:self.offsets[name + 1]].tolist()
+
     def get_area_by_name(self, name):
         """Get instance of Area by its name
 
@@ -36,9 +77,7 @@ class Board(object):
         Area
             Instance of an area
         """
-        for a in self.areas:
-            if name == self.areas[a].get_name():
-                return self.areas[a]
+        return self.areas.get(name)
 
     def get_board(self):
         """Get dictionary listing adjacent areas for each area
@@ -0,0 +1,78 @@
+from bisect import bisect_right
+
+
+def sum_counts(max_dice):
+    """Count the ways each sum can be rolled with up to max_dice dice
+
+    Parameters
+    ----------
+    max_dice : int
+
+    Returns
+    -------
+    dict of int: list of int
+        For n dice, list of counts of sums n, n + 1, ..., 6 * n
+    """
+    counts = {1: [1] * 6}
+    for n in range(2, max_dice + 1):
+        previous = counts[n - 1]
+        current = [0] * (5 * n + 1)
+        for i, count in enumerate(previous):
+            for face in range(6):
+                current[i + face] += count
+        counts[n] = current
+    return counts
+
+
+def cumulative_counts(max_dice):
+    """Cumulative counts of sums of dice, see sum_counts
+
+    Returns
+    -------
+    dict of int: list of int
+        For n dice, list of numbers of ways to roll at most n, n + 1, ..., 6 * n
+    """
+    tables = {}
+    for n, counts in sum_counts(max_dice).items():
+        total = 0
+        table = []
+        for count in counts:
+            total += count
+            table.append(total)
+        tables[n] = table
+    return tables
+
+
+CUMULATIVE_COUNTS = cumulative_counts(8)
+
+
+class DiceRoller(object):
+    """Roller of sums of dice
+
+    Instead of rolling every die, a sum of n dice is drawn with a single
+    random number from the precomputed distribution of the sums.
+    """
+    def __init__(self, rng):
+        """
+        Parameters
+        ----------
+        rng : random.Random
+            Random number generator, any object with randrange method
+        """
+        self.rng = rng
+
+    def roll(self, dice):
+        """Roll dice
+
+        Parameters
+        ----------
+        dice : int
+            Number of dice, 1 to 8
+
+        Returns
+        -------
+        int
+            Sum of the dice
+        """
+        table = CUMULATIVE_COUNTS[dice]
+        return dice + bisect_right(table, self.rng.randrange(table[-1]))
@@ -1,44 +1,174 @@
-import hexutil
-from random import randint, choice as rand_choice, shuffle
+from array import array
+import random
+
+
+# offsets of the six neighbours of a hex in the same order as hexutil.Hex.neighbours
+NEIGHBOURS = ((2, 0), (1, 1), (-1, 1), (-2, 0), (-1, -1), (1, -1))
+
+FREE = 0
+BORDER = 1
+USED = 2
+
+# neighbours and coordinates of grids of given bounds
+GRIDS = {}
+
+# board parameters, see BoardGenerator
+PRESETS = {
+    'default': {
+        'size': (32, 28),
+        'areas': (29, 31),
+        'area_size': (12, 18),
+        'players': 2,
+    },
+    'stress': {
+        'size': (80, 64),
+        'areas': (220, 240),
+        'area_size': (12, 18),
+        'players': 8,
+    },
+}
 
 
 class BoardGenerator(object):
     """Generator of game board
+
+    The grid is stored in flat arrays indexed by integer hex coordinates.
+    Hex (x, y) has index (y - min_y) * width + (x - min_x) // 2, where x
+    is shifted by one in odd rows.
+
+    Random choices pick uniformly among the valid hexes directly instead of
+    shuffling all candidates and taking the first valid one, which gives
+    boards with the same distribution at a fraction of the cost.
     """
-    def __init__(self):
+    def __init__(self, rng=None, size=(32, 28), areas=(29, 31), area_size=(12, 18),
+                 max_steps=None, max_restarts=10):
         """
+        Parameters
+        ----------
+        rng : random.Random
+            Random number generator, a new one if None
+        size : (int, int)
+            Number of hexes in a row and number of rows of the grid,
+            the grid is centered at hex (0, 0)
+        areas : (int, int)
+            Minimum and maximum number of areas
+        area_size : (int, int)
+            Minimum and maximum number of hexes an area grows to before
+            it is filled
+        max_steps : int
+            Number of hexes tried to be added to areas, no new areas are
+            started once it is exceeded; this bounds generation time
+            independently of the machine. Ten times the largest possible
+            number of hexes in areas if None
+        max_restarts : int
+            Number of times creation of a single area may start over
+            before the area is dropped
+
         Attributes
         ----------
         min_x, max_x, min_y, max_y : int
             Boundary values for Hex coordinates
+        width : int
+            Number of hexes in a row
+        neighbours : list of tuple of int
+            Indices of the six neighbours of each hex, -1 for neighbours
+            outside of the grid
+        coordinates : frozenset of int
+            Indices of hexes new areas can start from
+        border : set of int
+            Free hexes adjacent to a used hex
+        counters : dict of str: int
+            Statistics of the last generated board, see get_counters
+        """
+        self.rng = rng or random.Random()
+        self.areas_range = areas
+        self.area_size = area_size
+        self.max_steps = max_steps or 10 * areas[1] * area_size[1]
+        self.max_restarts = max_restarts
+        self.counters = {}
+        self.width, self.height = size
+        # hexes of even rows have even x, also for an odd number of hexes in a row
+        self.min_x = -2 * (self.width // 2)
+        self.max_x = self.min_x + 2 * (self.width - 1)
+        self.min_y = -(self.height // 2)
+        self.max_y = self.min_y + self.height - 1
+
+        bounds = (self.min_x, self.max_x, self.min_y, self.max_y)
+        if bounds not in GRIDS:
+            GRIDS[bounds] = self.create_grid()
+        self.neighbours, self.coordinates = GRIDS[bounds]
+
+    def create_grid(self):
+        """Find neighbours of all hexes and hexes new areas can start from
+
+        Returns
+        -------
+        list of tuple of int, frozenset of int
+        """
+        neighbours = []
+        for i in range(self.width * self.height):
+            x, y = self.get_hex(i)
+            neighbours.append(tuple(self.get_index(x + dx, y + dy) for dx, dy in NEIGHBOURS))
+
+        coordinates = set()
+        for x in range(self.min_x + 2, self.max_x, 2):
+            for y in range(self.min_y + 1, self.max_y):
+                coordinates.add(self.get_index(x + y % 2, y))
+        return neighbours, frozenset(coordinates)
+
+    def get_index(self, x, y):
+        """Get index of a hex
+
+        Parameters
+        ----------
+        x, y : int
+            Coordinates of the hex
+
+        Returns
+        -------
+        int
+            Index of the hex, -1 if it is outside of the grid
         """
-        self.min_x = -32
-        self.max_x = 30
-        self.min_y = -14
-        self.max_y = 13
-        self.coordinates = [(x, y) for x in range(self.min_x + 2, self.max_x, 2)
-                            for y in range(self.min_y + 1, self.max_y)]
-        for i in range(len(self.coordinates)):
-            if self.coordinates[i][1] % 2 == 1:
-                self.coordinates[i] = (self.coordinates[i][0] + 1, self.coordinates[i][1])
+        if not self.min_y <= y <= self.max_y:
+            return -1
+        column = (x - self.min_x - y % 2) // 2
+        if not 0 <= column < self.width:
+            return -1
+        return (y - self.min_y) * self.width + column
+
+    def get_hex(self, i):
+        """Get coordinates of a hex
+
+        Parameters
+        ----------
+        i : int
+            Index of the hex
+
+        Returns
+        -------
+        (int, int)
+        """
+        row, column = divmod(i, self.width)
+        y = row + self.min_y
+        return self.min_x + 2 * column + y % 2, y
 
     def random_hex(self):
-        """Get random Hex from the board
+        """Get random hex from the board
 
         Returns
         -------
-        hexutil.Hex
-            Random hex from within the game board
+        int
+            Index of a random hex from within the game board
         """
-        y = randint(self.min_y, self.max_y)
+        y = self.rng.randint(self.min_y, self.max_y)
         while True:
             if y % 2 == 0:
-                x = randint(self.min_x, self.max_x)
+                x = self.rng.randint(self.min_x, self.max_x)
             else:
-                x = randint(self.min_x + 1, self.max_x + 1)
+                x = self.rng.randint(self.min_x + 1, self.max_x + 1)
             if (x + y) % 2 == 0:
                 break
-        return hexutil.Hex(x, y)
+        return self.get_index(x, y)
 
     def generate_board(self):
         """Method generating the board
@@ -46,155 +176,202 @@ class BoardGenerator(object):
         Returns
         -------
         dict
-            Dictionary of areas in the game board. Contains names of adjacent 
+            Dictionary of areas in the game board. Contains names of adjacent
             areas and coordinates of the hexes of each area
         """
-        self.a = {}
+        size = self.width * self.height
+        self.state = array('B', bytes(size))
+        self.owner = array('H', bytes(2 * size))
+        self.border = set()
         self.areas = {}
-        for i in range(self.min_y, self.max_y + 1):
-            self.a[i] = {}
-            if i % 2 == 0:
-                for j in range(self.min_x, self.max_x + 1, 2):
-                    self.a[i][j] = 0
-            else:
-                for j in range(self.min_x + 1, self.max_x + 2, 2):
-                    self.a[i][j] = 0
+        self.counters = {
+            'areas': 0,
+            'steps': 0,
+            'restarts': 0,
+            'dropped_areas': 0,
+        }
 
-        for i in range(1, 30 + randint(0, 2)):
-            self.__create_area(i)
+        count = self.rng.randint(*self.areas_range)
+        for i in range(count):
+            if self.counters['steps'] >= self.max_steps:
+                self.counters['dropped_areas'] += count - i
+                break
+            # names of areas stay consecutive even if an area is dropped
+            if not self.__create_area(len(self.areas) + 1):
+                self.counters['dropped_areas'] += 1
         self.__add_neighbours()
+        self.counters['areas'] = len(self.areas)
+
+        board = {}
+        for area in self.areas:
+            board[area] = {
+                'hexes': [self.get_hex(h) for h in self.areas[area]['hexes']],
+                'neighbours': self.areas[area]['neighbours'],
+            }
+        return board
+
+    def get_counters(self):
+        """Get statistics of the last generated board
 
-        return self.areas
+        Returns
+        -------
+        dict of str: int
+            Number of areas created, hexes tried to be added to areas,
+            restarts of area creation, and areas that were dropped
+        """
+        return dict(self.counters)
 
     def __create_area(self, area):
         """Create an area from Hexes
+
+        Returns
+        -------
+        bool
+            False if the area was dropped because there was no room to
+            start it or it had to start over too many times
         """
         self.possible_hexes = []
         i = 0
-        size = randint(12, 18)
+        restarts = 0
+        size = self.rng.randint(*self.area_size)
         while i < size:
-            ret = self.__add_hex_to_area(area)
-            i += 1
-            if not ret:
-                i = 0
+            started = area in self.areas
+            self.counters['steps'] += 1
+            if self.__add_hex_to_area(area):
+                i += 1
+                continue
+
+            if not started:
+                return False
+            # the area got stuck and was removed, start it over
+            restarts += 1
+            self.counters['restarts'] += 1
+            if restarts > self.max_restarts:
+                return False
+            i = 0
         self.__fill_area(area)
+        return True
 
     def __fill_area(self, area):
         """Fills empty Hexes inside the area
         """
-        for h in self.areas[area]['hexes']:
-            for n in h.neighbours():
-                counter = 0
-                if n.y not in self.a or n.x not in self.a[n.y] or self.a[n.y][n.x] != 1:
+        hexes = self.areas[area]['hexes']
+        for h in hexes:
+            for n in self.neighbours[h]:
+                if n < 0 or self.state[n] != BORDER:
                     break
-                for nn in n.neighbours():
-                    if (nn.y not in self.a or nn.x not in self.a[nn.y]):
-                        counter += 1
-                    elif nn not in self.areas[area]['hexes']:
+                counter = 0
+                for nn in self.neighbours[n]:
+                    if nn < 0 or self.owner[nn] != area:
                         counter += 1
-                    if counter > 2:
-                        break
+                        if counter > 2:
+                            break
                 if counter <= 2:
-                    self.__retag_neighbouring_hexes(n)
-                    self.a[n.y][n.x] = 2
-                    self.areas[area]['hexes'].append(n)
+                    self.__use_hex(n, area)
                     break
 
     def __add_hex_to_area(self, area):
         """Add a single Hex to area being created
         """
         if not self.areas:
-            return self.__start_first_area()
+            return self.__start_first_area(area)
         elif area not in self.areas:
             return self.__start_area(area)
         else:
             return self.__grow_area(area)
 
-    def __start_first_area(self):
+    def __start_first_area(self, area):
         """Add first Hex to first area on the board
         """
         self.h = self.random_hex()
         self.possible_hexes.append(self.h)
-        self.a[self.h.y][self.h.x] = 2
-        self.__retag_neighbouring_hexes(self.h)
-        self.areas[1] = {
-            'hexes': [self.h],
+        self.areas[area] = {
+            'hexes': [],
             'neighbours': []
         }
+        self.__use_hex(self.h, area)
         return True
 
     def __start_area(self, area):
-        """Add first Hex to an area
-        """
-        shuffle(self.coordinates)
-        for coord in self.coordinates:
-            x = coord[0]
-            y = coord[1]
-            if self.a[y][x] == 0:
-                h = hexutil.Hex(x, y)
-                for n in h.neighbours():
-                    if n.y in self.a and n.x in self.a[n.y] and self.a[n.y][n.x] == 1:
-                        self.h = h
-                        self.possible_hexes.append(h)
-                        self.a[h.y][h.x] = 2
-                        self.__retag_neighbouring_hexes(h)
-                        self.areas[area] = {
-                            'hexes': [h],
-                            'neighbours': []
-                        }
-                        return True
+        """Add first Hex to an area, the hex is a free hex next to
+        the border of the used hexes
+        """
+        state = self.state
+        starts = set()
+        for b in self.border:
+            for n in self.neighbours[b]:
+                if n >= 0 and state[n] == FREE:
+                    starts.add(n)
+        starts = sorted(starts & self.coordinates)
+        if not starts:
+            return False
+
+        self.h = self.rng.choice(starts)
+        self.possible_hexes.append(self.h)
+        self.areas[area] = {
+            'hexes': [],
+            'neighbours': []
+        }
+        self.__use_hex(self.h, area)
+        return True
 
     def __grow_area(self, area):
         """Add hex to already existing area
         """
         while True:
             if self.h != self.areas[area]['hexes'][0] or self.h not in self.possible_hexes:
-                self.h = rand_choice(self.possible_hexes)
+                self.h = self.rng.choice(self.possible_hexes)
 
             n = self.__neighbour()
-            if n:
+            if n >= 0:
                 self.possible_hexes.append(n)
-                self.a[n.y][n.x] = 2
-                self.__retag_neighbouring_hexes(n)
-                self.areas[area]['hexes'].append(n)
+                self.__use_hex(n, area)
                 return True
 
             else:
                 self.possible_hexes.remove(self.h)
                 if not self.possible_hexes:
-                    self.areas.pop(area)
+                    # hexes of the dropped area stay used, but belong to no area
+                    for h in self.areas.pop(area)['hexes']:
+                        self.owner[h] = 0
                     return False
 
-    def __retag_neighbouring_hexes(self, hex):
-        """Mark adjacent Hexes as neighbours to already used Hex
+    def __use_hex(self, h, area):
+        """Add hex to an area and mark adjacent free hexes as border
         """
-        for n in hex.neighbours():
-            if n.y in self.a and n.x in self.a[n.y]:
-                if self.a[n.y][n.x] == 0:
-                    self.a[n.y][n.x] = 1
+        self.state[h] = USED
+        self.owner[h] = area
+        self.border.discard(h)
+        self.areas[area]['hexes'].append(h)
+        for n in self.neighbours[h]:
+            if n >= 0 and self.state[n] == FREE:
+                self.state[n] = BORDER
+                self.border.add(n)
 
     def __neighbour(self):
         """Get random adjacent Hex
+
+        Returns
+        -------
+        int
+            Index of the hex, -1 if all adjacent hexes are used
         """
-        ns = self.h.neighbours()
-        shuffle(ns)
-        for n in ns:
-            if n.y in self.a and n.x in self.a[n.y]:
-                if self.a[n.y][n.x] != 2:
-                    return n
-        return False
+        state = self.state
+        ns = [n for n in self.neighbours[self.h] if n >= 0 and state[n] != USED]
+        if not ns:
+            return -1
+        return self.rng.choice(ns)
 
     def __add_neighbours(self):
         """Add neighbours of an area to the areas dict based
+        on the hex to area lookup
         """
+        owner = self.owner
         for a in self.areas:
+            neighbours = self.areas[a]['neighbours']
             for h in self.areas[a]['hexes']:
-                for n in h.neighbours():
-                    if (n.y in self.a and n.x in self.a[n.y] and self.a[n.y][n.x] == 2
-                        and n not in self.areas[a]['hexes']):
-                        for k in self.areas:
-                            if a == k:
-                                continue
-                            if n in self.areas[k]['hexes']:
-                                if k not in self.areas[a]['neighbours']:
-                                    self.areas[a]['neighbours'].append(k)
+                for n in self.neighbours[h]:
+                    if n >= 0:
+                        k = owner[n]
+                        if k and k != a and k not in neighbours:
+                            neighbours.append(k)
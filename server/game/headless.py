@@ -0,0 +1,249 @@
+import logging
+import time
+
+from . import Game
+from .record import GameRecorder, read_record
+
+
+class HeadlessGame(Game):
+    """Instance of the game running without networking
+
+    Clients are replaced by agents living in the same process. Every agent
+    has to implement two methods:
+
+        handle_message(msg)
+            Receive a message (dict) the server would send to the client,
+            the message may be shared with other agents and must not be
+            modified
+        get_turn()
+            Return a command (dict) the client would send to the server
+
+    Agents do not render the board, they get areas' adjacency without
+    coordinates of the hexes.
+    """
+    def __init__(self, agents, max_turns=None, delta=True, rng=None, seed=None,
+                 record=None, board=None, move_time=None, turn_time=None, stats=None,
+                 generator=None, start=None):
+        """Initialize game and assign agents to players
+
+        Parameters
+        ----------
+        agents : list
+            Agents playing the game, the first agent is assigned to player 1
+        max_turns : int
+            Maximum number of turns before the game is ended without a winner,
+            unlimited if None
+        delta : bool
+            Send only changes of the game state in battle and end_turn messages
+        rng : random.Random
+            Random number generator used by the game, a new one if None
+        seed : int
+            Seed of the random number generator if rng is None, random if None
+        record : str
+            Path to a file the game record is written to
+        board : dict
+            Board to play on instead of a generated one
+        move_time : float
+            Seconds an agent has for a single move, unlimited if None
+        turn_time : float
+            Seconds an agent has for the whole turn, unlimited if None
+        stats : Stats
+            Statistics the game loop is measured into; not measured if None
+        generator : dict
+            Keyword arguments of BoardGenerator, see generator.PRESETS
+        start : dict
+            Start of the game instead of a random one, see Game.assign_start
+
+        Attributes
+        ----------
+        agents : dict of int: agent
+            Agents of the players
+        battles : int
+            Number of battles carried out
+        turns : int
+            Number of turns ended
+        """
+        self.logger = logging.getLogger('SERVER')
+
+        self.number_of_players = len(agents)
+        self.max_turns = max_turns
+        self.delta = delta
+        self.init_random(rng, seed)
+        self.recorder = GameRecorder(record) if record else None
+        self.init_timing(move_time, turn_time)
+        self.battles = 0
+        self.turns = 0
+
+        self.initialize_game(board, generator, start)
+        self.init_stats(stats)
+        self.agents = {}
+        self.client_features = {}
+        for i, agent in enumerate(agents, 1):
+            self.agents[i] = agent
+            self.client_features[i] = {'geometry': False}
+
+    def run(self):
+        """Main loop of the game
+
+        Returns
+        -------
+        dict
+            Result of the game, see get_result
+        """
+        self.broadcast('game_start')
+        self.broadcast('game_state')
+
+        while True:
+            self.handle_player_turn()
+            if self.check_win_condition():
+                break
+            if self.max_turns and self.turns >= self.max_turns:
+                self.logger.info("Game ended after {} turns.".format(self.turns))
+                break
+
+        if self.recorder:
+            self.recorder.close()
+        return self.get_result()
+
+    def get_result(self):
+        """Get result of the game
+
+        Returns
+        -------
+        dict
+            Winner of the game (None if there is none), order of the players,
+            number of turns and battles, number of areas of each player
+            and summary of their response times
+        """
+        winner = None
+        areas = {}
+        for p in self.players:
+            player = self.players[p]
+            areas[p] = player.get_number_of_areas()
+            if areas[p] == self.board.get_number_of_areas():
+                winner = p
+
+        return {
+            'seed': self.seed,
+            'winner': winner,
+            'order': self.players_order,
+            'turns': self.turns,
+            'battles': self.battles,
+            'areas': areas,
+            'latency': self.get_latency(),
+        }
+
+    def handle_message(self, player, msg):
+        """Carry out the action of the current player and count battles,
+        see Game.handle_message
+
+        The message is already checked, so invalid battles are not counted.
+        """
+        if msg['type'] == 'battle':
+            self.battles += 1
+        super(HeadlessGame, self).handle_message(player, msg)
+
+    def end_turn(self):
+        """Handles end turn command and counts turns
+        """
+        self.turns += 1
+        return super(HeadlessGame, self).end_turn()
+
+    ##############
+    # NETWORKING #
+    ##############
+    def get_message(self, player, timeout=None):
+        """Get command from player's agent
+
+        Agents cannot be interrupted, a command that took longer than
+        the timeout is discarded.
+
+        Parameters
+        ----------
+        player : int
+            Name of the player
+        timeout : float
+            Seconds the agent has for the command, unlimited if None
+
+        Returns
+        -------
+        dict
+            Command of the agent, None if it was not made in time
+        """
+        start = time.monotonic()
+        msg = self.agents[player].get_turn()
+        if timeout is not None and time.monotonic() - start > timeout:
+            return None
+        self.logger.debug("Got message from agent {}; type: {}".format(player, msg['type']))
+        return msg
+
+    def send_message(self, client, type, battle=None, winner=None, areas=None):
+        """Pass message to player's agent
+        """
+        msg = self.create_message(client, type, battle=battle, winner=winner, areas=areas)
+        self.agents[client.get_name()].handle_message(msg)
+
+    def broadcast(self, type, battle=None, winner=None, areas=None):
+        """Pass message to all agents, the message is created only once
+        """
+        msg = self.create_message(None, type, battle=battle, winner=winner, areas=areas)
+        for p in self.players:
+            fields = self.get_recipient_fields(self.players[p], type)
+            self.agents[p].handle_message(dict(msg, **fields) if fields else msg)
+
+    def discard_messages(self, player):
+        """Agents have no pending messages
+        """
+        pass
+
+
+class EndOfRecord(Exception):
+    """All moves of a game record have been replayed
+    """
+    pass
+
+
+class ReplayAgent(object):
+    """Agent repeating recorded moves
+    """
+    def __init__(self, moves):
+        """
+        Parameters
+        ----------
+        moves : iterator of dict
+            Recorded moves shared by the agents of all players
+        """
+        self.moves = moves
+
+    def handle_message(self, msg):
+        pass
+
+    def get_turn(self):
+        try:
+            return next(self.moves)
+        except StopIteration:
+            raise EndOfRecord()
+
+
+def replay(path):
+    """Replay a recorded game
+
+    Parameters
+    ----------
+    path : str
+        Path to the game record
+
+    Returns
+    -------
+    dict
+        Result of the game, see HeadlessGame.get_result
+    """
+    header, moves = read_record(path)
+    moves = iter(moves)
+    agents = [ReplayAgent(moves) for i in range(header['players'])]
+    game = HeadlessGame(agents, seed=header['seed'], board=header['board'],
+                        start=header.get('start'))
+    try:
+        return game.run()
+    except EndOfRecord:
+        return game.get_result()
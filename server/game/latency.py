@@ -0,0 +1,73 @@
+class LatencyHistogram(object):
+    """Histogram of players' response times
+
+    Response times are counted in buckets with upper bounds of powers
+    of two milliseconds.
+    """
+    BOUNDS = [2 ** i for i in range(15)]
+
+    def __init__(self):
+        """
+        Attributes
+        ----------
+        counts : list of int
+            Number of responses in each bucket, the last bucket counts
+            responses slower than the last bound
+        total : float
+            Sum of all response times in seconds
+        timeouts : int
+            Number of moves the player did not make in time
+        """
+        self.counts = [0] * (len(self.BOUNDS) + 1)
+        self.total = 0.0
+        self.max = 0.0
+        self.timeouts = 0
+
+    def add(self, seconds, timeout=False):
+        """Add a response time
+
+        Parameters
+        ----------
+        seconds : float
+            Response time
+        timeout : bool
+            The player did not respond in time
+        """
+        ms = seconds * 1000
+        bucket = 0
+        while bucket < len(self.BOUNDS) and ms >= self.BOUNDS[bucket]:
+            bucket += 1
+        self.counts[bucket] += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        if timeout:
+            self.timeouts += 1
+
+    def get_count(self):
+        """Number of responses
+        """
+        return sum(self.counts)
+
+    def to_dict(self):
+        """Get summary of the histogram
+
+        Returns
+        -------
+        dict
+            Number of moves, mean and maximum response time in milliseconds,
+            number of timeouts and counts of non-empty buckets labeled
+            by their upper bound in milliseconds
+        """
+        count = self.get_count()
+        buckets = {}
+        for bound, n in zip(self.BOUNDS + ['inf'], self.counts):
+            if n:
+                buckets['<{0}'.format(bound)] = n
+
+        return {
+            'moves': count,
+            'mean_ms': round(self.total * 1000 / count, 3) if count else 0.0,
+            'max_ms': round(self.max * 1000, 3),
+            'timeouts': self.timeouts,
+            'buckets': buckets,
+        }
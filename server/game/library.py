@@ -0,0 +1,139 @@
+import mmap
+import random
+import struct
+
+from common.geometry import decode_board, encode_board, hash_data
+
+from .generator import BoardGenerator
+
+
+MAGIC = b'DWBL'
+VERSION = 1
+
+HEADER = struct.Struct('<4sHI')
+INDEX = struct.Struct('<II8s')
+
+
+def write_library(path, boards):
+    """Write boards to a library file
+
+    The file starts with a header (magic, version, number of boards),
+    followed by an index with offset, length and fingerprint of each
+    board, and the encoded boards.
+
+    Parameters
+    ----------
+    path : str
+    boards : list of dict
+        Boards as created by BoardGenerator
+    """
+    records = [encode_board(board) for board in boards]
+    offset = HEADER.size + INDEX.size * len(records)
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(records)))
+        for record in records:
+            f.write(INDEX.pack(offset, len(record), bytes.fromhex(hash_data(record))))
+            offset += len(record)
+        for record in records:
+            f.write(record)
+
+
+def generate_library(path, count, seed=None, generator=None):
+    """Generate boards and write them to a library file
+
+    Parameters
+    ----------
+    path : str
+    count : int
+        Number of boards
+    seed : int
+        Seed of the board generator, random if None
+    generator : dict
+        Keyword arguments of BoardGenerator, see generator.PRESETS
+    """
+    generator = BoardGenerator(rng=random.Random(seed), **(generator or {}))
+    write_library(path, [generator.generate_board() for i in range(count)])
+
+
+class BoardLibrary(object):
+    """Library of pregenerated boards stored in a memory-mapped file,
+    see write_library
+    """
+    def __init__(self, path):
+        """
+        Parameters
+        ----------
+        path : str
+            Path to the library file
+
+        Attributes
+        ----------
+        count : int
+            Number of boards in the library
+        """
+        with open(path, 'rb') as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, self.count = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC or version != VERSION:
+            self.data.close()
+            raise ValueError("{0} is not a board library of version {1}".format(path, VERSION))
+
+    def __len__(self):
+        return self.count
+
+    def get_board(self, board_id):
+        """Load a board and check it against its fingerprint
+
+        Parameters
+        ----------
+        board_id : int
+            Position of the board in the library
+
+        Returns
+        -------
+        dict
+            Board in the form created by BoardGenerator
+
+        Raises
+        ------
+        ValueError
+            If the board does not match its fingerprint
+        """
+        if not 0 <= board_id < self.count:
+            raise IndexError("No board {0} in the library of {1} boards".format(board_id, self.count))
+        offset, length = INDEX.unpack_from(self.data, HEADER.size + INDEX.size * board_id)[:2]
+        if hash_data(self.data[offset:offset + length]) != self.get_fingerprint(board_id):
+            raise ValueError("Board {0} of the library is corrupted".format(board_id))
+        return decode_board(self.data, offset)
+
+    def get_fingerprint(self, board_id):
+        """Get fingerprint of a board, see geometry.hash_data
+
+        Parameters
+        ----------
+        board_id : int
+
+        Returns
+        -------
+        str
+        """
+        return INDEX.unpack_from(self.data, HEADER.size + INDEX.size * board_id)[2].hex()
+
+    def random_board(self, rng):
+        """Load a random board
+
+        Parameters
+        ----------
+        rng : random.Random
+
+        Returns
+        -------
+        dict
+        """
+        return self.get_board(rng.randrange(self.count))
+
+    def close(self):
+        """Close the library file
+        """
+        self.data.close()
@@ -0,0 +1,406 @@
+import asyncio
+import logging
+import random
+import time
+
+from common.codec import (DECODE_ERRORS, PROTOCOL_VERSION, choose_encoding, get_codec, json_decode,
+                          json_encode)
+from common.framing import HEADER, encode_frame
+
+from . import Game
+from .record import GameRecorder
+
+
+class AsyncGame(Game):
+    """Instance of the game played over asyncio streams
+
+    The board is set up when the game starts running, in a worker thread,
+    so that generating a large board does not stall other games.
+    """
+    def __init__(self, game_id, connections, delta=False, seed=None, record=None,
+                 move_time=None, turn_time=None, stats=None, board=None, generator=None,
+                 start=None):
+        """Initialize game and assign connections to players
+
+        Parameters
+        ----------
+        game_id : int
+            Identifier of the game
+        connections : list of (StreamReader, StreamWriter, (function, function, function), dict)
+            Connections of the clients, their codecs and features, see
+            LobbyServer.handshake; the first one is assigned to player 1
+        delta : bool
+            Send only changes of the game state in battle and end_turn messages
+        seed : int
+            Seed of the random number generator, random if None
+        record : str
+            Path to a file the game record is written to
+        move_time : float
+            Seconds a player has for a single move, unlimited if None
+        turn_time : float
+            Seconds a player has for the whole turn, unlimited if None
+        stats : Stats
+            Statistics the game loop is measured into; not measured if None
+        board : dict
+            Board to play on instead of a generated one
+        generator : dict
+            Keyword arguments of BoardGenerator, see generator.PRESETS
+        start : dict
+            Start of the game instead of a random one, see Game.assign_start
+
+        Attributes
+        ----------
+        inboxes : dict of int: Queue
+            Messages received from the clients, None when a client disconnects
+        setup : (dict, dict, dict, Stats)
+            Board, generator, start and statistics the game is set up with,
+            see run
+        """
+        self.buffer = 65535
+        self.logger = logging.getLogger('SERVER')
+
+        self.game_id = game_id
+        self.number_of_players = len(connections)
+        self.delta = delta
+        self.init_random(None, seed)
+        self.recorder = GameRecorder(record) if record else None
+        self.init_timing(move_time, turn_time)
+        self.setup = (board, generator, start, stats)
+
+        self.connections = {}
+        self.inboxes = {}
+        self.client_features = {}
+        for i, (reader, writer, codec, features) in enumerate(connections, 1):
+            if stats:
+                codec = stats.wrap_codec(codec)
+            self.connections[i] = (reader, writer, codec)
+            self.client_features[i] = features
+            self.inboxes[i] = asyncio.Queue()
+
+    async def run(self):
+        """Main loop of the game
+        """
+        receivers = [asyncio.ensure_future(self.receive_messages(i)) for i in self.connections]
+        try:
+            board, generator, start, stats = self.setup
+            await asyncio.get_running_loop().run_in_executor(None, self.initialize_game, board, generator, start)
+            self.init_stats(stats)
+
+            self.broadcast('game_start')
+            self.broadcast('game_state')
+            await self.drain()
+
+            while True:
+                player = self.current_player.get_name()
+                timeout = self.start_move(player)
+                start = time.monotonic()
+                msg = await self.get_message(player, timeout)
+                msg = self.check_move(player, msg, time.monotonic() - start)
+                self.handle_message(player, msg)
+                await self.drain()
+                if self.check_win_condition():
+                    await self.drain()
+                    break
+
+        except (ConnectionError, asyncio.IncompleteReadError) + DECODE_ERRORS as e:
+            self.logger.error("Game {0}: connection to client failed: {1}".format(self.game_id, e))
+        finally:
+            for receiver in receivers:
+                receiver.cancel()
+            if self.recorder:
+                self.recorder.close()
+            self.logger.info("Game {0}: response times: {1}".format(self.game_id, self.get_latency()))
+            self.close_connections()
+
+    ##############
+    # NETWORKING #
+    ##############
+    async def receive_messages(self, player):
+        """Read messages from client into its inbox until it disconnects
+
+        Parameters
+        ----------
+        player : int
+            Name of the client
+        """
+        reader, writer, codec = self.connections[player]
+        try:
+            while True:
+                await self.inboxes[player].put(await read_frame(reader))
+        except (ConnectionError, asyncio.IncompleteReadError):
+            await self.inboxes[player].put(None)
+
+    async def get_message(self, player, timeout=None):
+        """Read message from client
+
+        Parameters
+        ----------
+        player : int
+            Name of the client
+        timeout : float
+            Seconds to wait for the message, unlimited if None
+
+        Returns
+        -------
+        dict
+            Decoded message from the client, None if it did not come in time
+        """
+        try:
+            raw_message = await asyncio.wait_for(self.inboxes[player].get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        if raw_message is None:
+            raise ConnectionResetError("Client {0} disconnected".format(player))
+        msg = self.connections[player][2][1](raw_message)
+        self.logger.debug("Got message from client {}; type: {}".format(player, msg['type']))
+        return msg
+
+    def get_codec(self, player):
+        """Get codec of messages agreed with the client, see codec.get_codec
+        """
+        return self.connections[player][2]
+
+    def send_data(self, client, data):
+        """Write encoded message to the client's stream, see drain
+        """
+        self.connections[client.get_name()][1].write(data)
+
+    def discard_messages(self, player):
+        """Discard messages the client has sent so far
+
+        Parameters
+        ----------
+        player : int
+            Name of the client
+        """
+        inbox = self.inboxes[player]
+        while not inbox.empty():
+            if inbox.get_nowait() is None:
+                # keep the disconnection for get_message
+                inbox.put_nowait(None)
+                break
+            self.logger.warning("Game {0}: discarding late message from client {1}".format(self.game_id, player))
+
+    async def drain(self):
+        """Wait until messages are sent to all clients
+        """
+        await asyncio.gather(*[c[1].drain() for c in self.connections.values()])
+
+    def close_connections(self):
+        """Close connections to clients
+        """
+        for reader, writer, codec in self.connections.values():
+            writer.close()
+
+
+async def read_frame(reader):
+    """Read a single frame from a stream
+
+    Parameters
+    ----------
+    reader : StreamReader
+
+    Returns
+    -------
+    bytes
+        Payload of the frame
+    """
+    length = HEADER.unpack(await reader.readexactly(HEADER.size))[0]
+    return await reader.readexactly(length)
+
+
+class LobbyServer(object):
+    """Server hosting many concurrent games in a single process
+
+    Connecting clients wait in a lobby until there are enough of them
+    to start a new game.
+    """
+    def __init__(self, players, addr, port, delta=False, seed=None, record=None, games=None,
+                 move_time=None, turn_time=None, stats=None, library=None, board_id=None,
+                 generator=None, starts=None, ready=None):
+        """
+        Parameters
+        ----------
+        players : int
+            Number of players in a game
+        addr : str
+            IP address of the server
+        port : int
+            Port number
+        delta : bool
+            Send only changes of the game state in battle and end_turn messages
+        seed : int
+            Seed of the first game, game i is seeded with seed + i;
+            random if None
+        record : str
+            Prefix of game records, game i is recorded to <record>.<i>
+        games : int
+            Number of games to host before the server stops, unlimited if None
+        move_time : float
+            Seconds a player has for a single move, unlimited if None
+        turn_time : float
+            Seconds a player has for the whole turn, unlimited if None
+        stats : Stats
+            Statistics all games are measured into, dumped when the server
+            stops; not measured if None
+        library : BoardLibrary
+            Library the boards are loaded from, boards are generated if None
+        board_id : int
+            Board of the library all games are played on, a random board
+            for each game if None
+        generator : dict
+            Keyword arguments of BoardGenerator, see generator.PRESETS
+        starts : StartPool
+            Pool of balanced starts, a random start of the pool is used
+            for each game instead of the board library; starts are dealt
+            at random if None
+        ready : function
+            Called once the server accepts connections of clients
+
+        Attributes
+        ----------
+        lobby : list of (StreamReader, StreamWriter, (function, function, function), dict)
+            Connections waiting for a game
+        running : set of Task
+            Games in progress
+        """
+        self.logger = logging.getLogger('SERVER')
+
+        self.number_of_players = players
+        self.address = addr
+        self.port = port
+        self.delta = delta
+        self.seed = seed
+        self.record = record
+        self.games = games
+        self.move_time = move_time
+        self.turn_time = turn_time
+        self.stats = stats
+        self.library = library
+        self.board_id = board_id
+        self.generator = generator
+        self.starts = starts
+        self.ready = ready
+        self.rng = random.Random(seed)
+
+        self.lobby = []
+        self.running = set()
+        self.started = 0
+
+    def run(self):
+        """Run the server until all games are played
+        """
+        try:
+            asyncio.run(self.serve())
+        except KeyboardInterrupt:
+            self.logger.info("Server interrupted.")
+        if self.stats:
+            self.stats.dump()
+
+    async def serve(self):
+        """Accept clients and host games
+        """
+        self.finished = asyncio.Event()
+        server = await asyncio.start_server(self.add_client, self.address, self.port)
+        self.logger.debug("Server socket at {}:{}".format(self.address, self.port))
+        if self.ready:
+            self.ready()
+        async with server:
+            await self.finished.wait()
+
+    async def add_client(self, reader, writer):
+        """Add a connected client to the lobby and start a game
+        once there are enough clients
+        """
+        if self.games is not None and self.started >= self.games:
+            writer.close()
+            return
+
+        try:
+            encoding, features = await self.handshake(reader, writer)
+        except (ConnectionError, asyncio.IncompleteReadError, KeyError, TypeError) + DECODE_ERRORS as e:
+            self.logger.error("Handshake failed: {0}".format(e))
+            encoding = None
+        if not encoding:
+            writer.close()
+            return
+
+        self.logger.debug("Client {0} joined the lobby".format(writer.get_extra_info('peername')))
+        self.lobby = [c for c in self.lobby if not c[0].at_eof()]
+        self.lobby.append((reader, writer, get_codec(encoding), features))
+
+        if len(self.lobby) >= self.number_of_players:
+            connections = self.lobby[:self.number_of_players]
+            self.lobby = self.lobby[self.number_of_players:]
+            self.start_game(connections)
+
+    async def handshake(self, reader, writer):
+        """Agree with a client on protocol version and encoding of messages,
+        see Game.handshake
+
+        Returns
+        -------
+        str, dict
+            Name of the encoding, None if the client is not supported,
+            and features of the client
+        """
+        msg = json_decode(await read_frame(reader))
+        encoding = None
+        features = {}
+        if msg['type'] == 'hello' and msg['version'] == PROTOCOL_VERSION:
+            encoding = choose_encoding(msg['encodings'])
+            features = {
+                'boards': set(msg.get('boards', [])),
+                'geometry': msg.get('geometry', True),
+            }
+        else:
+            self.logger.error("Unsupported client protocol: {0}".format(msg))
+
+        writer.write(encode_frame(json_encode({
+            'type': 'hello',
+            'version': PROTOCOL_VERSION,
+            'encoding': encoding,
+        })))
+        await writer.drain()
+        return encoding, features
+
+    def start_game(self, connections):
+        """Start a new game in a separate task
+
+        Parameters
+        ----------
+        connections : list of (StreamReader, StreamWriter, (function, function, function), dict)
+        """
+        game_id = self.started
+        self.started += 1
+
+        seed = self.seed + game_id if self.seed is not None else None
+        record = "{0}.{1}".format(self.record, game_id) if self.record else None
+        board = None
+        start = None
+        if self.starts:
+            start = self.starts.random_start(self.rng)
+        elif self.library:
+            if self.board_id is not None:
+                board = self.library.get_board(self.board_id)
+            else:
+                board = self.library.random_board(self.rng)
+        game = AsyncGame(game_id, connections, delta=self.delta, seed=seed, record=record,
+                         move_time=self.move_time, turn_time=self.turn_time, stats=self.stats,
+                         board=board, generator=self.generator, start=start)
+        self.logger.info("Starting game {0}".format(game_id))
+
+        task = asyncio.ensure_future(game.run())
+        task.set_name("Game {0}".format(game_id))
+        self.running.add(task)
+        task.add_done_callback(self.end_game)
+
+    def end_game(self, task):
+        """Remove finished game and stop the server after the last one
+        """
+        self.running.discard(task)
+        if not task.cancelled() and task.exception():
+            e = task.exception()
+            self.logger.error("{0} failed: {1!r}".format(task.get_name(), e), exc_info=e)
+        if self.games is not None and self.started >= self.games and not self.running:
+            self.finished.set()
@@ -14,8 +14,16 @@ class Player(object):
 
         Attributes
         ----------
-        areas : list of Area
-            Areas belonging to the player
+        areas : dict of int: Area
+            Areas belonging to the player in order of their acquisition
+        dice : int
+            Number of dice in player's areas
+        regions : dict of int: set of Area
+            Connected regions of player's areas
+        region_of : dict of int: int
+            Region of each player's area
+        largest_region : int
+            Size of the largest region, i.e. player's score
         dice_reserve : int
             Number of dice in player's reserve
         client_addr : str
@@ -29,7 +37,12 @@ class Player(object):
         self.name = name
         self.logger = logging.getLogger('SERVER')
 
-        self.areas = []
+        self.areas = {}
+        self.dice = 0
+        self.regions = {}
+        self.region_of = {}
+        self.largest_region = 0
+        self.next_region = 0
         self.client_addr = None
         self.client_port = None
         self.socket = None
@@ -38,11 +51,23 @@ class Player(object):
     def add_area(self, area):
         """Add area to player's areas
         """
-        if area in self.areas:
+        if area.get_name() in self.areas:
             self.logger.warning("Area {0} already belonging to player {1}."\
                                 .format(area.get_name(), self.name))
         else:
-            self.areas.append(area)
+            self.areas[area.get_name()] = area
+            self.dice += area.get_dice()
+            self.join_regions(area)
+
+    def add_dice(self, dice):
+        """Update number of dice after dice in player's area changed
+
+        Parameters
+        ----------
+        dice : int
+            Number of dice added, negative if removed
+        """
+        self.dice += dice
 
     def assign_client(self, socket, client_addr):
         """Assign client's socket, IP address, and port number
@@ -67,58 +92,20 @@ class Player(object):
         -------
         list of Area
         """
-        return self.areas
+        return list(self.areas.values())
 
     #def get_areas_names(self):
     #    return ','.join(str(a.get_name()) for a in self.areas)
 
-    def get_largest_region(self, board):
+    def get_largest_region(self):
         """Get player's score
 
-        Parameters
-        ----------
-        board : Board
-
         Returns
         -------
         int
             Player's score
         """
-        largest_region_size = 0
-        areas_to_test = self.areas
-        player_areas = []
-
-        if not areas_to_test:
-            return 0
-
-        areas_in_current_region = [areas_to_test[0]]
-
-        while areas_to_test:
-            areas_already_tested = []
-            while areas_in_current_region:
-                current_area = areas_in_current_region[0]
-                areas_in_current_region.remove(current_area)
-                areas_already_tested.append(current_area)
-
-                for area in current_area.get_adjacent_areas():
-                    if (area not in areas_already_tested and
-                        area not in areas_in_current_region):
-                        if area.get_owner_name() == self.name:
-                            areas_in_current_region.append(area)
-
-            if len(areas_already_tested) > largest_region_size:
-                largest_region_size = len(areas_already_tested)
-
-            for area in areas_already_tested:
-                if area in areas_to_test:
-                    areas_to_test.remove(area)
-                    player_areas.append(area)
-
-            if areas_to_test:
-                areas_in_current_region = [areas_to_test[0]]
-
-        self.areas = player_areas
-        return largest_region_size
+        return self.largest_region
 
     def get_name(self):
         """Return player's name
@@ -142,18 +129,97 @@ class Player(object):
     def remove_area(self, area):
         """Remove area from list of areas controlled by the player
         """
-        if area not in self.areas:
+        if area.get_name() not in self.areas:
             self.logger.warning("Trying to remove area {0} that doesn't\
                                 belong to player {1}".format(area.get_name(),
                                 self.name))
         else:
-            self.areas.remove(area)
+            del self.areas[area.get_name()]
+            self.dice -= area.get_dice()
+            self.split_region(area)
+
+    def join_regions(self, area):
+        """Add area to regions, merging all regions it connects
+        """
+        regions = set()
+        for adj in area.get_adjacent_areas():
+            region = self.region_of.get(adj.get_name())
+            if region is not None:
+                regions.add(region)
+
+        if regions:
+            # merge smaller regions into the largest one
+            target = max(regions, key=lambda r: len(self.regions[r]))
+            regions.remove(target)
+            for region in regions:
+                for a in self.regions.pop(region):
+                    self.region_of[a.get_name()] = target
+                    self.regions[target].add(a)
+        else:
+            target = self.new_region()
+
+        self.regions[target].add(area)
+        self.region_of[area.get_name()] = target
+        self.largest_region = max(self.largest_region, len(self.regions[target]))
+
+    def split_region(self, area):
+        """Remove area from its region and split the region if it
+        is no longer connected
+        """
+        region = self.region_of.pop(area.get_name(), None)
+        if region is None:
+            return
+        areas = self.regions[region]
+        old_size = len(areas)
+        areas.remove(area)
+
+        neighbours = [adj for adj in area.get_adjacent_areas() if adj in areas]
+        if not areas:
+            self.regions.pop(region)
+        elif len(neighbours) > 1:
+            # the region can be split only if the area connected several areas
+            self.regions.pop(region)
+            while areas:
+                start = areas.pop()
+                new_region = self.new_region()
+                component = {start}
+                queue = [start]
+                while queue:
+                    current = queue.pop()
+                    for adj in current.get_adjacent_areas():
+                        if adj in areas:
+                            areas.remove(adj)
+                            component.add(adj)
+                            queue.append(adj)
+                self.regions[new_region] = component
+                for a in component:
+                    self.region_of[a.get_name()] = new_region
+
+        if old_size == self.largest_region:
+            self.largest_region = max((len(r) for r in self.regions.values()), default=0)
+
+    def new_region(self):
+        """Create a new empty region
+
+        Returns
+        -------
+        int
+            Identifier of the region
+        """
+        self.next_region += 1
+        self.regions[self.next_region] = set()
+        return self.next_region
 
     def send_message(self, msg):
         """Send message msg to the Player's client
+
+        Parameters
+        ----------
+        msg : bytes
+            Encoded message
         """
         try:
-            self.socket.sendall(msg.encode())
+            self.socket.sendall(msg)
         except socket.error as e:
             self.logger.error("Connection to client {0} broken".format(
                               self.name))
@@ -172,8 +238,5 @@ class Player(object):
     def total_dice(self):
         """Return total number of Player's dice
         """
-        td = 0
-        for area in self.areas:
-            td += area.get_dice()
-        return td
+        return self.dice
 
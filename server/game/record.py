@@ -0,0 +1,107 @@
+import json
+
+
+class GameRecorder(object):
+    """Writer of game records
+
+    A record is a text file. The first line is a JSON header containing
+    the seed of the game, number of players, adjacent areas of each area
+    of the board, and the start of the game if it was not dealt at random.
+    Every following line is a single move, "<atk> <def>" for
+    a battle and "e" for the end of turn.
+    """
+    def __init__(self, path):
+        """
+        Parameters
+        ----------
+        path : str
+            Path to the record file
+        """
+        self.file = open(path, 'w', buffering=1)
+
+    def start(self, seed, players, board, start=None):
+        """Write header of the record
+
+        Parameters
+        ----------
+        seed : int
+            Seed of the game's random number generator
+        players : int
+            Number of players
+        board : dict
+            Board as created by BoardGenerator
+        start : dict
+            Start of the game, see Game.assign_start; None if it was
+            dealt at random
+        """
+        header = {
+            'version': 1,
+            'seed': seed,
+            'players': players,
+            'board': {name: board[name]['neighbours'] for name in board},
+        }
+        if start is not None:
+            header['start'] = {
+                'order': start['order'],
+                'areas': start['areas'],
+            }
+        self.file.write(json.dumps(header) + '\n')
+
+    def add_move(self, msg):
+        """Write a single move
+
+        Parameters
+        ----------
+        msg : dict
+            Message from a client
+        """
+        if msg['type'] == 'battle':
+            self.file.write("{0} {1}\n".format(msg['atk'], msg['def']))
+        elif msg['type'] == 'end_turn':
+            self.file.write("e\n")
+
+    def close(self):
+        """Close the record file
+        """
+        self.file.close()
+
+
+def read_record(path):
+    """Read a game record
+
+    Parameters
+    ----------
+    path : str
+        Path to the record file
+
+    Returns
+    -------
+    dict, list of dict
+        Header of the record with the board in the form used by Board
+        and the start in the form used by Game.assign_start, and messages
+        of the recorded moves
+    """
+    with open(path) as f:
+        header = json.loads(f.readline())
+        moves = []
+        for line in f:
+            line = line.split()
+            if not line:
+                continue
+            if line[0] == 'e':
+                moves.append({'type': 'end_turn'})
+            else:
+                moves.append({
+                    'type': 'battle',
+                    'atk': int(line[0]),
+                    'def': int(line[1])
+                })
+
+    header['board'] = {
+        int(name): {'neighbours': neighbours}
+        for name, neighbours in header['board'].items()
+    }
+    if 'start' in header:
+        header['start']['areas'] = {int(name): area for name, area in header['start']['areas'].items()}
+        header['start']['board'] = header['board']
+    return header, moves
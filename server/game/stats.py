@@ -0,0 +1,181 @@
+import functools
+import inspect
+import json
+import signal
+import sys
+import time
+
+
+class Stats(object):
+    """Timers and call counters of the phases of the game loop
+
+    Methods are measured by replacing them with timed wrappers on the
+    instance, so that games without statistics run unchanged code. Times
+    of nested phases are included in the times of the enclosing ones.
+    """
+    def __init__(self, path=None):
+        """
+        Parameters
+        ----------
+        path : str
+            File the statistics are appended to as JSON lines, standard
+            error output if None or '-'
+
+        Attributes
+        ----------
+        timers : dict of str: list
+            Number of calls, total and maximum time in seconds of each phase
+        counters : dict of str: int
+            Other counted quantities, e.g. bytes sent
+        """
+        self.path = path if path != '-' else None
+        self.timers = {}
+        self.counters = {}
+        self.codecs = {}
+        self.start = time.monotonic()
+
+    def add_time(self, name, seconds):
+        """Add a single measurement of a phase
+        """
+        timer = self.timers.get(name)
+        if timer is None:
+            timer = self.timers[name] = [0, 0.0, 0.0]
+        timer[0] += 1
+        timer[1] += seconds
+        if seconds > timer[2]:
+            timer[2] = seconds
+
+    def count(self, name, n=1):
+        """Increase a counter
+        """
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def wrap(self, name, func):
+        """Get function measuring time of the calls of func
+
+        Parameters
+        ----------
+        name : str
+            Name of the phase
+        func : function
+            Function or coroutine function
+
+        Returns
+        -------
+        function
+        """
+        clock = time.perf_counter
+        add_time = self.add_time
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def timed(*args, **kwargs):
+                start = clock()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    add_time(name, clock() - start)
+        else:
+            @functools.wraps(func)
+            def timed(*args, **kwargs):
+                start = clock()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    add_time(name, clock() - start)
+        return timed
+
+    def instrument(self, obj, names, prefix=None):
+        """Measure methods of an object
+
+        Parameters
+        ----------
+        obj : object
+        names : list of str
+            Names of the methods
+        prefix : str
+            Prefix of the phases' names, name of obj's class if None
+        """
+        if prefix is None:
+            prefix = type(obj).__name__
+        for name in names:
+            method = getattr(obj, name)
+            setattr(obj, name, self.wrap("{0}.{1}".format(prefix, name), method))
+
+    def wrap_codec(self, codec):
+        """Measure encoding and decoding of messages and count their bytes
+
+        Parameters
+        ----------
+        codec : (function, function, function)
+            Encoder, decoder and extender of messages, see codec.get_codec
+
+        Returns
+        -------
+        (function, function, function)
+            The same measured codec for the same codec
+        """
+        if codec in self.codecs:
+            return self.codecs[codec]
+
+        encode, decode = self.wrap('encode', codec[0]), self.wrap('decode', codec[1])
+        extend = self.wrap('extend', codec[2])
+
+        def counted_encode(msg):
+            data = encode(msg)
+            self.count('bytes_encoded', len(data))
+            return data
+
+        def counted_decode(data):
+            self.count('bytes_decoded', len(data))
+            return decode(data)
+
+        def counted_extend(data, fields):
+            data = extend(data, fields)
+            self.count('bytes_encoded', len(data))
+            return data
+
+        self.codecs[codec] = (counted_encode, counted_decode, counted_extend)
+        return self.codecs[codec]
+
+    def to_dict(self):
+        """Get summary of the statistics
+
+        Returns
+        -------
+        dict
+            Seconds since the statistics were created, and number of
+            calls, total, mean and maximum time of each phase
+        """
+        timers = {}
+        for name in sorted(self.timers):
+            calls, total, longest = self.timers[name]
+            timers[name] = {
+                'calls': calls,
+                'total_s': round(total, 6),
+                'mean_us': round(total * 1e6 / calls, 3),
+                'max_us': round(longest * 1e6, 3),
+            }
+
+        return {
+            'elapsed_s': round(time.monotonic() - self.start, 6),
+            'timers': timers,
+            'counters': dict(self.counters),
+        }
+
+    def dump(self):
+        """Write summary of the statistics as a single JSON line
+        """
+        line = json.dumps(self.to_dict()) + '\n'
+        if self.path:
+            with open(self.path, 'a') as f:
+                f.write(line)
+        else:
+            sys.stderr.write(line)
+            sys.stderr.flush()
+
+    def dump_on_signal(self, signum=getattr(signal, 'SIGUSR1', None)):
+        """Dump the statistics whenever the process receives the signal
+        """
+        if signum is not None:
+            signal.signal(signum, lambda signum, frame: self.dump())
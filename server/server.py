@@ -1,8 +1,24 @@
 #!/usr/bin/env python3
 import logging
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from args import parse
 from game import Game
+from game.balance import StartPool
+from game.library import BoardLibrary
+from game.lobby import LobbyServer
+from game.stats import Stats
+
+
+def signal_ready(fd):
+    """Tell the launcher that the server accepts clients
+    """
+    with os.fdopen(fd, 'wb') as f:
+        f.write(b'ready\n')
 
 
 def main():
@@ -14,7 +30,44 @@ def main():
     logger = logging.getLogger('SERVER')
     logger.debug("Command line arguments: {0}".format(args))
 
-    game = Game(args.number_of_players, args.address, args.port)
+    stats = None
+    if args.stats:
+        stats = Stats(args.stats)
+        stats.dump_on_signal()
+
+    ready = None
+    if args.ready_fd is not None:
+        ready = lambda: signal_ready(args.ready_fd)
+
+    library = BoardLibrary(args.boards) if args.boards else None
+    starts = StartPool(args.starts) if args.starts else None
+    if starts and starts.players != args.number_of_players:
+        logger.error("Start pool {0} is for {1} players".format(args.starts, starts.players))
+        exit(1)
+
+    if args.lobby:
+        server = LobbyServer(args.number_of_players, args.address, args.port, delta=args.delta,
+                             seed=args.seed, record=args.record, games=args.games,
+                             move_time=args.move_time, turn_time=args.turn_time, stats=stats,
+                             library=library, board_id=args.board, generator=args.generator,
+                             starts=starts, ready=ready)
+        server.run()
+        return
+
+    board = None
+    start = None
+    if starts:
+        start = starts.random_start(random.Random(args.seed))
+    elif library:
+        if args.board is not None:
+            board = library.get_board(args.board)
+        else:
+            board = library.random_board(random.Random(args.seed))
+
+    game = Game(args.number_of_players, args.address, args.port, delta=args.delta,
+                seed=args.seed, record=args.record, move_time=args.move_time,
+                turn_time=args.turn_time, stats=stats, board=board, generator=args.generator,
+                start=start, ready=ready)
     game.run()
 
 
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# the client's modules are imported as top-level modules, as in client.py
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, root)
+sys.path.insert(0, os.path.join(root, 'client'))
@@ -0,0 +1,43 @@
+import os
+import random
+
+from common.geometry import encode_board, hash_data
+from game.cache import BoardCache
+from server.game.generator import BoardGenerator
+
+
+def create_boards(count):
+    generator = BoardGenerator(rng=random.Random(0))
+    boards = [encode_board(generator.generate_board()) for i in range(count)]
+    return [(hash_data(data), data) for data in boards]
+
+
+def test_least_recently_used(tmp_path):
+    """The least recently used boards are removed above the size of the cache
+    """
+    boards = create_boards(4)
+    cache = BoardCache(str(tmp_path), size=3)
+    for fingerprint, data in boards[:3]:
+        cache.store(fingerprint, data)
+    assert cache.load(boards[0][0]) is not None
+    cache.store(*boards[3])
+
+    kept = sorted(boards[i][0] for i in (0, 2, 3))
+    assert cache.get_fingerprints() == kept
+    assert sorted(os.listdir(str(tmp_path))) == kept
+    assert cache.load(boards[1][0]) is None
+
+
+def test_reopen(tmp_path):
+    """Boards are ranked by modification time when the cache is opened
+    """
+    boards = create_boards(3)
+    for i, (fingerprint, data) in enumerate(boards):
+        path = str(tmp_path / fingerprint)
+        with open(path, 'wb') as f:
+            f.write(data)
+        os.utime(path, (1000 - i, 1000 - i))
+
+    cache = BoardCache(str(tmp_path), size=2)
+    assert cache.get_fingerprints() == sorted(boards[i][0] for i in (0, 1))
+    assert cache.load(boards[0][0]) is not None
@@ -0,0 +1,58 @@
+import pytest
+
+from common.codec import ENCODINGS, choose_encoding, extend_message, get_codec, pack, unpack
+
+
+MESSAGE = {
+    'type': 'end_turn',
+    'seq': 42,
+    'areas': {1: {'owner': 2, 'dice': 8}, 300: {'owner': 1, 'dice': 1}},
+    'current_player': 3,
+    'reserves': {1: 0, 2: 64},
+    'order': [3, 1, 2],
+    'name': 'x' * 40,
+    'ratio': 0.25,
+    'negative': [-1, -32, -33, -70000],
+    'large': [127, 128, 65536, 1 << 40],
+    'flags': [True, False, None],
+    'long': list(range(20)),
+    'map': {str(i): i for i in range(20)},
+}
+
+
+def test_pack_round_trip():
+    assert unpack(pack(MESSAGE)) == MESSAGE
+
+
+def test_pack_tuple():
+    assert unpack(pack((1, (2, 3)))) == [1, [2, 3]]
+
+
+def test_pack_unsupported():
+    with pytest.raises(TypeError):
+        pack({1, 2})
+
+
+@pytest.mark.parametrize('encoding', sorted(ENCODINGS))
+def test_round_trip(encoding):
+    encode, decode, extend = get_codec(encoding)
+    msg = decode(encode(MESSAGE))
+    if encoding == 'json':
+        # JSON has only string keys
+        assert msg['areas'] == {'1': {'owner': 2, 'dice': 8}, '300': {'owner': 1, 'dice': 1}}
+    else:
+        assert msg == MESSAGE
+
+
+@pytest.mark.parametrize('encoding', sorted(ENCODINGS))
+@pytest.mark.parametrize('msg', [{}, {'type': 'battle'}, MESSAGE])
+def test_extend_message(encoding, msg):
+    codec = get_codec(encoding)
+    fields = {'board_id': '0123456789abcdef', 'player': 2}
+    data = extend_message(codec, codec[0](msg), fields)
+    assert codec[1](data) == codec[1](codec[0](dict(msg, **fields)))
+
+
+def test_choose_encoding():
+    assert choose_encoding(['cbor', 'msgpack', 'json']) == 'msgpack'
+    assert choose_encoding(['cbor']) is None
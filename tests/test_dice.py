@@ -0,0 +1,66 @@
+import random
+
+import pytest
+
+from server.game.balance import StartDealer
+from server.game.dice import DiceRoller, sum_counts
+
+
+class Enumeration(object):
+    """Random number generator returning every number of the range in turn
+    """
+    def __init__(self):
+        self.value = 0
+
+    def randrange(self, stop):
+        value = self.value % stop
+        self.value += 1
+        return value
+
+
+def test_sum_counts():
+    for n, counts in sum_counts(8).items():
+        assert len(counts) == 5 * n + 1
+        assert sum(counts) == 6 ** n
+
+
+@pytest.mark.parametrize('dice', range(1, 9))
+def test_roll_distribution(dice):
+    """Every random number maps to a sum so that sums follow the exact distribution
+    """
+    roller = DiceRoller(Enumeration())
+    rolled = [0] * (5 * dice + 1)
+    for i in range(6 ** dice):
+        rolled[roller.roll(dice) - dice] += 1
+    assert rolled == sum_counts(8)[dice]
+
+
+def test_seeded_roll():
+    roller = DiceRoller(random.Random(0))
+    rolls = [roller.roll(8) for i in range(20000)]
+    assert min(rolls) >= 8 and max(rolls) <= 48
+    assert abs(sum(rolls) / len(rolls) - 28) < 0.2
+
+
+@pytest.mark.parametrize('seed', range(5))
+@pytest.mark.parametrize('dice', [0, 5, 64, 1000])
+def test_distribute_dice(seed, dice):
+    """No area gets more than 8 dice and dice that do not fit are returned
+    """
+    rng = random.Random(seed)
+    game = StartDealer(2, seed)
+    player = game.players[1]
+    areas = player.get_areas()
+    for area in areas:
+        game.set_area_dice(area, rng.randint(1, 8))
+    before = {area.get_name(): area.get_dice() for area in areas}
+
+    left, affected = game.distribute_dice(areas, dice)
+
+    assert all(area.get_dice() <= 8 for area in areas)
+    added = sum(area.get_dice() - before[area.get_name()] for area in areas)
+    assert left == dice - added
+    assert left == 0 or all(area.get_dice() == 8 for area in areas)
+    assert {area.get_name() for area in affected} == \
+        {area.get_name() for area in areas if area.get_dice() > before[area.get_name()]}
+    assert player.dice == sum(area.get_dice() for area in areas)
@@ -0,0 +1,37 @@
+import random
+
+from common.framing import HEADER, FrameBuffer, encode_frame
+
+
+def test_frame_header():
+    assert encode_frame(b'abc') == HEADER.pack(3) + b'abc'
+
+
+def test_split_frames():
+    """Frames are recovered however the data is split when received
+    """
+    rng = random.Random(0)
+    payloads = [bytes(rng.randrange(256) for i in range(rng.randrange(300))) for j in range(50)]
+    data = b''.join(encode_frame(p) for p in payloads)
+
+    buffer = FrameBuffer()
+    frames = []
+    pos = 0
+    while pos < len(data):
+        end = pos + rng.randint(1, 64)
+        buffer.feed(data[pos:end])
+        frames.extend(buffer.get_frames())
+        pos = end
+    assert frames == payloads
+    assert buffer.get_frame() is None
+
+
+def test_incomplete_frame():
+    buffer = FrameBuffer()
+    frame = encode_frame(b'payload')
+    buffer.feed(frame[:2])
+    assert buffer.get_frame() is None
+    buffer.feed(frame[2:-1])
+    assert buffer.get_frame() is None
+    buffer.feed(frame[-1:] + encode_frame(b''))
+    assert buffer.get_frames() == [b'payload', b'']
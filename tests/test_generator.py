@@ -0,0 +1,24 @@
+import random
+
+import pytest
+
+from server.game.generator import BoardGenerator
+
+
+@pytest.mark.parametrize('size', [(32, 28), (33, 28), (33, 27), (7, 5)])
+def test_grid(size):
+    """Every hex of the grid has valid coordinates and its own index
+    """
+    generator = BoardGenerator(size=size)
+    hexes = [generator.get_hex(i) for i in range(size[0] * size[1])]
+    assert all((x + y) % 2 == 0 for x, y in hexes)
+    assert all(generator.min_x <= x <= generator.max_x + 1 for x, y in hexes)
+    assert [generator.get_index(x, y) for x, y in hexes] == list(range(len(hexes)))
+
+
+@pytest.mark.parametrize('size', [(32, 28), (33, 28)])
+def test_board_hexes(size):
+    board = BoardGenerator(rng=random.Random(0), size=size).generate_board()
+    assert board
+    for area in board.values():
+        assert all((x + y) % 2 == 0 for x, y in area['hexes'])
@@ -0,0 +1,21 @@
+from server.game.headless import HeadlessGame
+
+
+class InvalidAgent(object):
+    """Agent attacking from an area it does not own
+    """
+    def handle_message(self, msg):
+        if msg['type'] == 'game_start':
+            self.player = msg['player']
+            self.areas = msg['areas']
+
+    def get_turn(self):
+        name = next(a for a in self.areas if self.areas[a]['owner'] != self.player)
+        return {'type': 'battle', 'atk': name, 'def': name}
+
+
+def test_invalid_battles_not_counted():
+    game = HeadlessGame([InvalidAgent(), InvalidAgent()], max_turns=4, seed=0)
+    result = game.run()
+    assert result['turns'] == 4
+    assert result['battles'] == 0
@@ -0,0 +1,31 @@
+import random
+
+import pytest
+
+from common.geometry import encode_board, hash_data
+from server.game.library import BoardLibrary, generate_library
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / 'boards.dwb')
+    generate_library(path, 3, seed=0)
+    library = BoardLibrary(path)
+    assert len(library) == 3
+    for i in range(3):
+        board = library.get_board(i)
+        assert hash_data(encode_board(board)) == library.get_fingerprint(i)
+    library.close()
+
+
+def test_corrupted_board(tmp_path):
+    path = str(tmp_path / 'boards.dwb')
+    generate_library(path, 1, seed=0)
+    with open(path, 'r+b') as f:
+        f.seek(-1, 2)
+        byte = f.read(1)
+        f.seek(-1, 2)
+        f.write(bytes([byte[0] ^ 1]))
+    library = BoardLibrary(path)
+    with pytest.raises(ValueError):
+        library.get_board(0)
+    library.close()
@@ -0,0 +1,62 @@
+import random
+
+import pytest
+
+from server.game.balance import StartDealer
+
+
+PLAYERS = 4
+
+
+def find_largest_region(game, player):
+    """Find size of the largest region of a player by searching the whole board
+    """
+    largest = 0
+    found = set()
+    for name, area in game.board.areas.items():
+        if name in found or area.get_owner_name() != player:
+            continue
+        region = {name}
+        stack = [area]
+        while stack:
+            for adj in stack.pop().get_adjacent_areas():
+                if adj.get_name() not in region and adj.get_owner_name() == player:
+                    region.add(adj.get_name())
+                    stack.append(adj)
+        found |= region
+        largest = max(largest, len(region))
+    return largest
+
+
+def check_players(game):
+    for name, player in game.players.items():
+        areas = [a for a in game.board.areas.values() if a.get_owner_name() == name]
+        assert player.get_largest_region() == find_largest_region(game, name)
+        assert player.dice == sum(a.get_dice() for a in areas)
+        assert player.get_number_of_areas() == len(areas)
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_random_changes(seed):
+    """Regions and dice of the players match a search of the whole board
+    after every battle and reassignment of an area
+    """
+    rng = random.Random(seed)
+    game = StartDealer(PLAYERS, seed)
+    check_players(game)
+
+    areas = [game.board.areas[name] for name in sorted(game.board.areas)]
+    for i in range(300):
+        area = rng.choice(areas)
+        if rng.random() < 0.7:
+            targets = [adj for adj in area.get_adjacent_areas()
+                       if adj.get_owner_name() != area.get_owner_name()]
+            if not targets:
+                continue
+            game.set_area_dice(area, rng.randint(2, 8))
+            game.battle(area, rng.choice(targets))
+        else:
+            owner = rng.choice([p for p in game.players if p != area.get_owner_name()])
+            game.players[area.get_owner_name()].remove_area(area)
+            game.assign_area(area, game.players[owner])
+        check_players(game)
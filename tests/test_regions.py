@@ -0,0 +1,101 @@
+import random
+
+import pytest
+
+from ai.regions import Regions
+from game.board import Board
+from server.game.generator import BoardGenerator
+
+
+PLAYERS = 4
+
+
+def create_board(rng):
+    """Create a client board with random owners and dice
+    """
+    geometry = BoardGenerator(rng=rng).generate_board()
+    areas = {name: {'owner': rng.randint(1, PLAYERS), 'dice': rng.randint(1, 8)}
+             for name in geometry}
+    return Board(areas, geometry)
+
+
+def find_regions(board, player, skip=None):
+    """Find regions of a player by searching the whole board
+    """
+    regions = []
+    found = set()
+    for name in board.areas:
+        if name == skip or name in found or board.get_area(name).get_owner_name() != player:
+            continue
+        region = {name}
+        stack = [name]
+        while stack:
+            for n in board.get_area(stack.pop()).get_adjacent_areas():
+                if n != skip and n not in region and board.get_area(n).get_owner_name() == player:
+                    region.add(n)
+                    stack.append(n)
+        found |= region
+        regions.append(region)
+    return regions
+
+
+def check_board(board):
+    for player in range(1, PLAYERS + 1):
+        areas = [a for a in board.areas.values() if a.get_owner_name() == player]
+        assert board.get_player_dice(player) == sum(a.get_dice() for a in areas)
+        assert board.get_player_areas(player) == {a.get_name() for a in areas}
+        assert board.get_number_of_areas(player) == len(areas)
+        assert board.get_frontier(player) == {
+            a.get_name() for a in areas
+            if any(board.get_area(n).get_owner_name() != player for n in a.get_adjacent_areas())
+        }
+
+
+def check_regions(board, regions):
+    for player in range(1, PLAYERS + 1):
+        expected = find_regions(board, player)
+        assert sorted(map(sorted, regions.get_regions(player))) == sorted(map(sorted, expected))
+        size = max(map(len, expected), default=0)
+        assert regions.get_largest_size(player) == size
+        assert sorted(map(sorted, regions.get_largest_regions(player))) == \
+            sorted(sorted(r) for r in expected if len(r) == size)
+
+        for name in board.get_player_areas(player):
+            assert name in regions.get_region(name)
+            without = find_regions(board, player, skip=name)
+            assert regions.get_score_without(player, name) == max(map(len, without), default=0)
+            assert regions.splits_region(name) == (len(without) > len(expected))
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_random_changes(seed):
+    """Aggregates of the board and regions match a search of the whole
+    board after every change of an area
+    """
+    rng = random.Random(seed)
+    board = create_board(rng)
+    regions = Regions(board)
+    check_board(board)
+    check_regions(board, regions)
+
+    names = sorted(board.areas)
+    for i in range(200):
+        area = board.get_area(rng.choice(names))
+        owner = rng.choice([p for p in range(1, PLAYERS + 1) if p != area.get_owner_name()])
+        area.set_owner(owner)
+        area.set_dice(rng.randint(1, 8))
+        check_board(board)
+        check_regions(board, regions)
+
+
+def test_conquest_of_player():
+    """A player losing all areas has no regions left
+    """
+    board = create_board(random.Random(0))
+    regions = Regions(board)
+    for name in sorted(board.get_player_areas(2)):
+        board.get_area(name).set_owner(1)
+    assert regions.get_regions(2) == []
+    assert regions.get_largest_size(2) == 0
+    assert board.get_player_dice(2) == 0
+    assert regions.get_largest_size(1) == max(map(len, find_regions(board, 1)))
@@ -0,0 +1,278 @@
+import csv
+import json
+import logging
+import os
+import random
+import sys
+from multiprocessing import Pool
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'client'))
+
+from server.game.balance import StartPool
+from server.game.headless import HeadlessGame
+from server.game.library import BoardLibrary
+from ai import get_ai
+from game.local import LocalAgent
+
+
+libraries = {}
+pools = {}
+
+
+def get_library(path):
+    """Get board library, each process opens a library only once
+    """
+    if path not in libraries:
+        libraries[path] = BoardLibrary(path)
+    return libraries[path]
+
+
+def get_pool(path):
+    """Get start pool, each process loads a pool only once
+    """
+    if path not in pools:
+        pools[path] = StartPool(path)
+    return pools[path]
+
+
+def play_game(game):
+    """Play a single headless game
+
+    Parameters
+    ----------
+    game : (int, list of int, int, int, float, float, (str, int), dict, (str, int))
+        Identifier of the game, AI versions of the players, maximum
+        number of turns, seed of the game, seconds a player has for
+        a single move and for the whole turn, path to a board
+        library with id of the board (None to generate the board),
+        keyword arguments of the board generator, and path to a start
+        pool with id of the start (None to deal the start at random)
+
+    Returns
+    -------
+    dict
+        Result of the game
+    """
+    game_id, ai_versions, max_turns, seed, move_time, turn_time, board, generator, start = game
+    result = {
+        'game': game_id,
+        'ai': ai_versions,
+        'seed': seed,
+        'winner': None,
+    }
+
+    # AIs use the global generator, seed it too so that the game can be repeated
+    random.seed(seed)
+    try:
+        if board:
+            result['board'] = board[1]
+            board = get_library(board[0]).get_board(board[1])
+        if start:
+            result['start'] = start[1]
+            start = get_pool(start[0]).get_start(start[1])
+        agents = [LocalAgent(get_ai(v)) for v in ai_versions]
+        game = HeadlessGame(agents, max_turns=max_turns, seed=seed,
+                            move_time=move_time, turn_time=turn_time, board=board,
+                            generator=generator, start=start)
+        result.update(game.run())
+    except (Exception, SystemExit) as e:
+        logging.getLogger('TOURNAMENT').error("Game {0} failed: {1!r}".format(game_id, e))
+        result['error'] = repr(e)
+
+    if result['winner']:
+        result['winner_ai'] = ai_versions[result['winner'] - 1]
+    else:
+        result['winner_ai'] = None
+    return result
+
+
+class Tournament(object):
+    """Series of headless games played in parallel
+    """
+    def __init__(self, ai_versions, games, jobs=None, output=None, max_turns=None, seed=None,
+                 move_time=None, turn_time=None, boards=None, generator=None, starts=None):
+        """
+        Parameters
+        ----------
+        ai_versions : list of int
+            AI versions of the players
+        games : int
+            Number of games to play
+        jobs : int
+            Number of worker processes, number of CPUs if None
+        output : str
+            File the results are written to, CSV if it ends with '.csv',
+            otherwise JSON lines
+        max_turns : int
+            Maximum number of turns of a single game
+        seed : int
+            Seed of the first game, game i is seeded with seed + i;
+            random if None
+        move_time : float
+            Seconds a player has for a single move, unlimited if None
+        turn_time : float
+            Seconds a player has for the whole turn, unlimited if None
+        boards : str
+            Path to a board library, all rotations of the players play
+            on the same board; boards are generated if None
+        generator : dict
+            Keyword arguments of BoardGenerator, see generator.PRESETS
+        starts : str
+            Path to a start pool, all rotations of the players play from
+            the same start; used instead of boards, starts are dealt at
+            random if None
+
+        Raises
+        ------
+        ValueError
+            If the start pool is not for as many players as there are
+            AI versions
+
+        Attributes
+        ----------
+        played : dict of int: int
+            Number of games played by each AI version
+        wins : dict of int: int
+            Number of games won by each AI version
+        """
+        self.ai_versions = ai_versions
+        self.games = games
+        self.jobs = jobs or os.cpu_count()
+        self.output = output
+        self.max_turns = max_turns
+        self.seed = seed if seed is not None else random.randrange(1 << 32)
+        self.move_time = move_time
+        self.turn_time = turn_time
+        self.boards = boards
+        self.generator = generator
+        self.starts = starts
+        if starts and get_pool(starts).players != len(ai_versions):
+            raise ValueError("Start pool {0} is for {1} players, not {2}".format(
+                starts, get_pool(starts).players, len(ai_versions)))
+
+        self.played = {v: 0 for v in ai_versions}
+        self.wins = {v: 0 for v in ai_versions}
+        self.unfinished = 0
+
+    def get_seats(self, game_id):
+        """Get AI versions of the players, rotated with each game
+
+        Parameters
+        ----------
+        game_id : int
+
+        Returns
+        -------
+        list of int
+        """
+        shift = game_id % len(self.ai_versions)
+        return self.ai_versions[shift:] + self.ai_versions[:shift]
+
+    def get_board(self, game_id):
+        """Get board of a game, the same for all rotations of the players
+
+        Parameters
+        ----------
+        game_id : int
+
+        Returns
+        -------
+        (str, int)
+            Path to the board library and id of the board, None if
+            the board is to be generated
+        """
+        if not self.boards:
+            return None
+        board_id = game_id // len(self.ai_versions) % len(get_library(self.boards))
+        return self.boards, board_id
+
+    def get_start(self, game_id):
+        """Get start of a game, the same for all rotations of the players
+
+        Parameters
+        ----------
+        game_id : int
+
+        Returns
+        -------
+        (str, int)
+            Path to the start pool and id of the start, None if the start
+            is to be dealt at random
+        """
+        if not self.starts:
+            return None
+        start_id = game_id // len(self.ai_versions) % len(get_pool(self.starts))
+        return self.starts, start_id
+
+    def run(self):
+        """Play all games, stream the results to the output file
+        """
+        games = ((i, self.get_seats(i), self.max_turns, self.seed + i,
+                  self.move_time, self.turn_time, self.get_board(i), self.generator,
+                  self.get_start(i))
+                 for i in range(self.games))
+        chunksize = max(1, min(16, self.games // (self.jobs * 4)))
+
+        out = open(self.output, 'w', newline='') if self.output else None
+        try:
+            writer = self.create_writer(out)
+            with Pool(self.jobs) as pool:
+                for result in pool.imap_unordered(play_game, games, chunksize):
+                    self.add_result(result)
+                    if writer:
+                        writer(result)
+        finally:
+            if out:
+                out.close()
+
+    def create_writer(self, out):
+        """Get function writing a single result to the output file
+        """
+        if not out:
+            return None
+
+        if self.output.endswith('.csv'):
+            writer = csv.writer(out)
+            writer.writerow(['game', 'ai', 'seed', 'winner', 'winner_ai', 'turns', 'battles',
+                             'timeouts'])
+
+            def write(result):
+                writer.writerow([
+                    result['game'],
+                    ' '.join(str(v) for v in result['ai']),
+                    result['seed'],
+                    result['winner'] or '',
+                    result['winner_ai'] or '',
+                    result.get('turns', ''),
+                    result.get('battles', ''),
+                    ' '.join(str(result['latency'][p]['timeouts'])
+                             for p in sorted(result.get('latency', {}))),
+                ])
+                out.flush()
+        else:
+            def write(result):
+                out.write(json.dumps(result) + '\n')
+                out.flush()
+
+        return write
+
+    def add_result(self, result):
+        """Add result of a game to the aggregate statistics
+        """
+        for v in set(result['ai']):
+            self.played[v] += 1
+        if result['winner_ai']:
+            self.wins[result['winner_ai']] += 1
+        else:
+            self.unfinished += 1
+
+    def print_summary(self):
+        """Print win rates of the AI versions
+        """
+        print("AI  games   wins  win rate")
+        for v in sorted(self.played):
+            played = self.played[v]
+            rate = self.wins[v] / played if played else 0.0
+            print("{0:<3} {1:>5} {2:>6} {3:>8.1%}".format(v, played, self.wins[v], rate))
+        if self.unfinished:
+            print("Games without a winner: {0}".format(self.unfinished))